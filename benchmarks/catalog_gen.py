@@ -0,0 +1,111 @@
+"""
+Génère un catalogue synthétique au format de config/catalog.json : catégories et produits
+aux noms français avec emoji, listes de médias, statistiques de vues (y compris des
+entrées orphelines pour que clean_stats ait du travail).
+
+Usage: python benchmarks/catalog_gen.py [--categories N] [--products N] [--media N] [--output fichier]
+"""
+import argparse
+import json
+import random
+from datetime import datetime
+
+EMOJIS = ["🌿", "🍓", "🍋", "🍇", "🍊", "🍫", "🍯", "🌸", "🔥", "❄️", "💎", "⭐", "🍀", "🌶️", "🥥", "🍒"]
+ADJECTIFS = ["Doux", "Fruité", "Épicé", "Sauvage", "Royal", "Givré", "Doré", "Fumé", "Léger", "Intense", "Velouté", "Boisé"]
+NOMS = ["Fraise", "Citron", "Mangue", "Cerise", "Pêche", "Vanille", "Menthe", "Réglisse", "Coco", "Framboise", "Myrtille", "Pistache"]
+ORIGINES = ["de Provence", "des Alpes", "du Maroc", "d'Espagne", "de Hollande", "du Liban", "de Bretagne", "des Andes"]
+GAMMES = ["Sélection", "Réserve", "Classique", "Prestige", "Découverte", "Collection", "Atelier", "Maison"]
+
+def category_name(rng, index):
+    # Les noms restent courts (<= 32 caractères) comme ceux acceptés par handle_category_name
+    return f"{rng.choice(EMOJIS)} {rng.choice(GAMMES)} {index}"
+
+def product_name(rng, index):
+    return f"{rng.choice(NOMS)} {rng.choice(ADJECTIFS)} {rng.choice(EMOJIS)} n°{index}"
+
+def product_description(rng):
+    return (
+        f"<b>{rng.choice(NOMS)} {rng.choice(ORIGINES)}</b>\n"
+        f"Notes {rng.choice(ADJECTIFS).lower()}es et {rng.choice(ADJECTIFS).lower()}es {rng.choice(EMOJIS)}\n"
+        f"Récolte {rng.randint(2019, 2025)}, qualité {rng.choice(GAMMES).lower()}."
+    )
+
+def product_media(rng, count):
+    media = []
+    for order_index in range(1, count + 1):
+        media_type = 'video' if rng.random() < 0.2 else 'photo'
+        prefix = 'BAACAgQAAxkBAAI' if media_type == 'video' else 'AgACAgQAAxkBAAI'
+        media.append({
+            'media_id': prefix + ''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-', k=56)),
+            'media_type': media_type,
+            'order_index': order_index,
+        })
+    # Ordre d'insertion mélangé : le chargement doit les trier
+    rng.shuffle(media)
+    return media
+
+def generate_catalog(categories=1000, products=20, media=3, orphan_ratio=0.05, seed=42):
+    """
+    `categories` catégories de `products` produits, chacun avec 0 à `media` médias.
+    Une part `orphan_ratio` des statistiques porte sur des catégories et produits inexistants.
+    """
+    rng = random.Random(seed)
+    catalog = {}
+    product_number = 0
+    for category_index in range(categories):
+        name = category_name(rng, category_index)
+        catalog[name] = []
+        for _ in range(products):
+            product_number += 1
+            catalog[name].append({
+                'name': product_name(rng, product_number),
+                'price': f"{rng.randint(5, 200)}€ les {rng.choice([1, 5, 10, 25])}g",
+                'description': product_description(rng),
+                'media': product_media(rng, rng.randint(0, media)),
+            })
+
+    category_views = {}
+    product_views = {}
+    total_views = 0
+    for category, items in catalog.items():
+        category_views[category] = rng.randint(0, 5000)
+        total_views += category_views[category]
+        product_views[category] = {product['name']: rng.randint(0, 2000) for product in items}
+
+    # Statistiques orphelines : catégories supprimées et produits renommés
+    orphans = max(1, int(categories * orphan_ratio))
+    for index in range(orphans):
+        deleted = f"Ancienne catégorie {index}"
+        category_views[deleted] = rng.randint(0, 500)
+        product_views[deleted] = {f"Ancien produit {index}-{i}": rng.randint(0, 100) for i in range(products)}
+    for category in rng.sample(list(catalog), min(orphans, len(catalog))):
+        product_views[category][f"Produit renommé {rng.randint(0, 10 ** 6)}"] = rng.randint(0, 100)
+
+    catalog['stats'] = {
+        'total_views': total_views,
+        'category_views': category_views,
+        'product_views': product_views,
+        'last_updated': datetime.now().strftime("%H:%M:%S"),
+        'last_reset': datetime.now().strftime("%Y-%m-%d"),
+    }
+    return catalog
+
+def write_catalog(path, catalog):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, indent=4, ensure_ascii=False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--categories', type=int, default=1000)
+    parser.add_argument('--products', type=int, default=20, help="produits par catégorie")
+    parser.add_argument('--media', type=int, default=3, help="médias maximum par produit")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='catalog_large.json')
+    args = parser.parse_args()
+
+    catalog = generate_catalog(args.categories, args.products, args.media, seed=args.seed)
+    write_catalog(args.output, catalog)
+    print(f"{args.categories} catégories, {args.categories * args.products} produits -> {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Tests de charge du catalogue : pour plusieurs tailles de catalogue synthétique,
+mesure load_catalog et save_catalog (JSON et snapshot binaire), le rendu des menus,
+clean_stats et l'écran des statistiques, avec les fonctions de main.py.
+
+Chaque mesure est la médiane de plusieurs répétitions, en millisecondes.
+
+Usage: python benchmarks/catalog_load.py [--sizes 100x20,1000x20,5000x20] [--repeat N]
+"""
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import time
+
+from catalog_gen import generate_catalog, write_catalog
+from replay import prepare_workdir, ROOT
+from pagination import PAGE_SIZE
+
+SNAPSHOT_FILE = 'config/catalog.snapshot'
+
+def measure(func, repeat, setup=None):
+    """Médiane des durées de `func` en millisecondes (setup est exécuté hors mesure)"""
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+def render_all_menus(main):
+    """Toutes les pages du menu des catégories et la première page de chaque catégorie"""
+    categories = [c for c in main.CATALOG if c != 'stats']
+    for offset in range(0, len(categories), PAGE_SIZE):
+        main.build_category_keyboard('cat', offset)
+    for category in categories:
+        main.build_product_keyboard('prod', category)
+
+def render_all_products(main):
+    """Fiche de chaque produit, cache de rendu vidé"""
+    main.invalidate_render_cache()
+    for category, products in main.CATALOG.items():
+        if category == 'stats':
+            continue
+        for product in products:
+            main.render_product(category[:10], product.name[:20])
+
+def run_size(main, categories, products, repeat):
+    catalog_file = main.CONFIG['catalog_file']
+    write_catalog(catalog_file, generate_catalog(categories, products))
+    size = os.path.getsize(catalog_file)
+
+    results = {'taille (Mo)': size / 1024 / 1024}
+    results['load_catalog'] = measure(main.load_catalog, repeat)
+    results['rechargement complet'] = measure(lambda: main.apply_catalog(main.load_catalog()), repeat)
+    results['save_catalog'] = measure(lambda: main.save_catalog(main.CATALOG), repeat)
+
+    # Même catalogue avec le snapshot binaire comme copie de travail, JSON en export
+    main.CONFIG['catalog_snapshot'] = SNAPSHOT_FILE
+    try:
+        results['save_catalog (snapshot)'] = measure(lambda: main.save_catalog(main.CATALOG), repeat)
+        results['load_catalog (snapshot)'] = measure(main.load_catalog, repeat)
+        results['taille snapshot (Mo)'] = os.path.getsize(SNAPSHOT_FILE) / 1024 / 1024
+        results['export JSON'] = measure(main.export_catalog, repeat, setup=lambda: main.save_catalog(main.CATALOG))
+    finally:
+        del main.CONFIG['catalog_snapshot']
+
+    results['menus (toutes pages)'] = measure(lambda: render_all_menus(main), repeat)
+    results['fiches produits'] = measure(lambda: render_all_products(main), max(1, repeat // 2))
+
+    # clean_stats ne travaille que si le catalogue a changé : forcer un nouveau passage
+    # sur une copie fraîche des statistiques orphelines
+    def reload_stats():
+        main.apply_catalog(main.load_catalog())
+        main.catalog_changed()
+    results['clean_stats'] = measure(main.clean_stats, repeat, setup=reload_stats)
+    results['écran statistiques'] = measure(main.build_stats_text, repeat, setup=reload_stats)
+    results['écran statistiques (cache)'] = measure(main.build_stats_text, repeat)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100x20,1000x20,5000x20',
+                        help="tailles catégoriesxproduits séparées par des virgules")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sizes = [tuple(int(n) for n in size.split('x')) for size in args.sizes.split(',')]
+
+    workdir = prepare_workdir()
+    try:
+        import main as bot
+        logging.getLogger().setLevel(logging.WARNING)
+
+        rows = {}
+        for categories, products in sizes:
+            rows[f"{categories}x{products}"] = run_size(bot, categories, products, args.repeat)
+
+        labels = list(next(iter(rows.values())))
+        print(f"{'mesure (ms)':<28}" + ''.join(f"{size:>14}" for size in rows))
+        for label in labels:
+            print(f"{label:<28}" + ''.join(f"{rows[size][label]:>14.2f}" for size in rows))
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
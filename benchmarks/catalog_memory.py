@@ -0,0 +1,103 @@
+"""
+Mémoire occupée par un grand catalogue synthétique et coût d'accès aux champs des produits,
+avant (dicts lus par json.load) et après (enregistrements __slots__ de catalog_model).
+
+Usage: python benchmarks/catalog_memory.py [--categories N] [--products N] [--repeat N]
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_gen import generate_catalog
+from catalog_model import PHOTO, catalog_from_json, catalog_to_json
+
+def load_before(text):
+    return json.loads(text)
+
+def load_after(text):
+    return catalog_from_json(json.loads(text))
+
+def measure_memory(load, text):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    catalog = load(text)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, 'filename')), catalog
+
+def read_before(catalog):
+    """Ce que font les menus et les fiches : nom, prix, description et médias de chaque produit"""
+    photos = 0
+    for category, products in catalog.items():
+        if category == 'stats':
+            continue
+        for product in products:
+            product['name'], product['price'], product['description']
+            for media in product.get('media') or ():
+                if media['media_type'] == 'photo':
+                    photos += 1
+    return photos
+
+def read_after(catalog):
+    photos = 0
+    for category, products in catalog.items():
+        if category == 'stats':
+            continue
+        for product in products:
+            product.name, product.price, product.description
+            for media in product.media or ():
+                if media.media_type is PHOTO:
+                    photos += 1
+    return photos
+
+def measure_access(read, catalog, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read(catalog)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+def sort_media(catalog):
+    """Le chargement trie les médias par order_index : même tri sur le JSON d'origine"""
+    for category, products in catalog.items():
+        if category != 'stats':
+            for product in products:
+                if 'media' in product:
+                    product['media'].sort(key=lambda media: media.get('order_index', 0))
+    return catalog
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--categories', type=int, default=1000)
+    parser.add_argument('--products', type=int, default=20, help="produits par catégorie")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    text = json.dumps(generate_catalog(args.categories, args.products), ensure_ascii=False)
+    products = args.categories * args.products
+    print(f"{args.categories} catégories, {products} produits, {len(text.encode('utf-8')) / 1024 / 1024:.1f} Mo de JSON")
+
+    results = {}
+    for label, load, read in (("avant", load_before, read_before), ("après", load_after, read_after)):
+        total, catalog = measure_memory(load, text)
+        access = measure_access(read, catalog, args.repeat)
+        results[label] = catalog
+        print(f"{label:>6}: {total / 1024 / 1024:8.1f} Mo, {total / products:6.0f} octets par produit, "
+              f"lecture de tous les champs {access:7.2f} ms")
+
+    # Le catalogue typé se réécrit à l'identique dans le format de catalog.json, médias triés
+    assert catalog_to_json(results["après"]) == sort_media(json.loads(text))
+    print("aller-retour JSON identique (médias triés)")
+
+if __name__ == '__main__':
+    main()
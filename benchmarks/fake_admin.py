@@ -0,0 +1,45 @@
+"""
+Remplaçant minimal de handlers.admin_features pour les benchmarks, utilisé quand le
+module réel n'est pas installé. Il fait les mêmes types d'appels à l'API (boutons du
+menu admin, diffusion à chaque utilisateur enregistré) sans base d'utilisateurs.
+"""
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+class AdminFeatures:
+    def __init__(self):
+        self.users = {}
+
+    async def register_user(self, user):
+        self.users[user.id] = user.username
+
+    async def add_user_buttons(self, keyboard):
+        keyboard = list(keyboard)
+        # Avant le bouton de retour à l'accueil, comme le module réel
+        keyboard[-1:-1] = [
+            [InlineKeyboardButton("👥 Gérer les utilisateurs", callback_data="manage_users")],
+            [InlineKeyboardButton("📢 Envoyer une annonce", callback_data="start_broadcast")],
+        ]
+        return keyboard
+
+    async def handle_user_management(self, update, context):
+        import main
+        await update.callback_query.edit_message_text(
+            f"👥 {len(self.users)} utilisateurs enregistrés",
+            reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Retour", callback_data="admin")]])
+        )
+        return main.CHOOSING
+
+    async def handle_broadcast(self, update, context):
+        import main
+        await update.callback_query.edit_message_text(
+            "📢 Envoyez le message à diffuser :",
+            reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Annuler", callback_data="admin")]])
+        )
+        return main.WAITING_BROADCAST_MESSAGE
+
+    async def send_broadcast_message(self, update, context):
+        import main
+        for user_id in self.users:
+            await context.bot.send_message(chat_id=user_id, text=update.message.text or "")
+        await update.message.reply_text(f"✅ Message envoyé à {len(self.users)} utilisateurs")
+        return main.CHOOSING
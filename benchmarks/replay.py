@@ -0,0 +1,410 @@
+"""
+Rejoue des parcours utilisateurs synthétiques dans les vrais handlers du bot
+(ConversationHandler de main.py et handlers du dice), avec un faux Bot en mémoire
+qui enregistre les appels à l'API au lieu de les envoyer à Telegram.
+
+Pour chaque scénario : updates/s, latence p50/p99 du traitement d'un update,
+appels API, sauvegardes sur disque et octets écrits par update.
+
+Le bot tourne dans une copie temporaire de config/ et data/ : les fichiers du dépôt
+ne sont jamais modifiés.
+
+Usage: python benchmarks/replay.py [--rounds N] [--scenario nom ...] [--catalog fichier.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from itertools import count
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from telegram import Update
+from telegram.ext import Application, CallbackQueryHandler
+from telegram.request import BaseRequest
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Bench', 'username': 'bench_bot'}
+GROUP_CHAT_ID = -1001
+
+class FakeRequest(BaseRequest):
+    """
+    Remplace la couche HTTP de python-telegram-bot : chaque appel est compté et reçoit
+    une réponse plausible (message avec un nouvel identifiant, True pour les suppressions...).
+    Les claviers envoyés sont conservés pour que les scénarios puissent "cliquer" dessus.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.message_ids = count(10_000)
+        # chat_id -> {message_id: (type de message, reply_markup)}
+        self.messages = {}
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _message(self, chat_id, message_id, params, kind='text'):
+        message = {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'supergroup'},
+            'from': BOT_USER,
+        }
+        if kind == 'photo':
+            message['photo'] = [{'file_id': f'photo{message_id}', 'file_unique_id': f'p{message_id}', 'width': 800, 'height': 600}]
+            message['caption'] = params.get('caption', '')
+        elif kind == 'video':
+            message['video'] = {'file_id': f'video{message_id}', 'file_unique_id': f'v{message_id}', 'width': 800, 'height': 600, 'duration': 5}
+            message['caption'] = params.get('caption', '')
+        else:
+            message['text'] = params.get('text', '')
+        if params.get('reply_markup'):
+            message['reply_markup'] = params['reply_markup']
+        chat_messages = self.messages.setdefault(chat_id, {})
+        previous = chat_messages.get(message_id)
+        chat_messages[message_id] = (kind, params.get('reply_markup') or (previous[1] if previous else None))
+        return message
+
+    def _result(self, endpoint, params):
+        chat_id = params.get('chat_id')
+        if isinstance(chat_id, str):
+            chat_id = int(chat_id)
+
+        if endpoint == 'getMe':
+            return dict(BOT_USER, can_join_groups=True, can_read_all_group_messages=False, supports_inline_queries=False)
+        if endpoint in ('sendMessage', 'sendPhoto', 'sendVideo'):
+            kind = {'sendPhoto': 'photo', 'sendVideo': 'video'}.get(endpoint, 'text')
+            return self._message(chat_id, next(self.message_ids), params, kind)
+        if endpoint == 'sendMediaGroup':
+            media = params.get('media') or []
+            return [self._message(chat_id, next(self.message_ids), {}, item.get('type', 'photo')) for item in media]
+        if endpoint in ('editMessageText', 'editMessageCaption', 'editMessageReplyMarkup', 'editMessageMedia'):
+            message_id = int(params['message_id'])
+            kind = self.messages.get(chat_id, {}).get(message_id, ('text', None))[0]
+            if endpoint == 'editMessageMedia':
+                kind = (params.get('media') or {}).get('type', kind)
+            return self._message(chat_id, message_id, params, kind)
+        if endpoint == 'deleteMessage':
+            self.messages.get(chat_id, {}).pop(int(params['message_id']), None)
+            return True
+        if endpoint == 'deleteMessages':
+            for message_id in params.get('message_ids') or []:
+                self.messages.get(chat_id, {}).pop(int(message_id), None)
+            return True
+        return True
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        endpoint = url.rsplit('/', 1)[-1]
+        self.calls[endpoint] += 1
+        params = request_data.parameters if request_data else {}
+        for key in ('reply_markup', 'media'):
+            if isinstance(params.get(key), str):
+                params[key] = json.loads(params[key])
+        return 200, json.dumps({'ok': True, 'result': self._result(endpoint, params)}).encode('utf-8')
+
+    def find_button(self, chat_id, prefix, index=0):
+        """Callback d'un bouton du message le plus récent dont un bouton commence par `prefix`"""
+        for message_id in sorted(self.messages.get(chat_id, {}), reverse=True):
+            kind, markup = self.messages[chat_id][message_id]
+            if not markup:
+                continue
+            matches = [
+                button['callback_data']
+                for row in markup.get('inline_keyboard', [])
+                for button in row
+                if button.get('callback_data', '').startswith(prefix)
+            ]
+            if matches:
+                return message_id, kind, matches[index % len(matches)]
+        return None
+
+def disk_bytes_written():
+    """Octets écrits par le processus (Linux), None si indisponible"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('wchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+def disk_saves():
+    """Nombre de sauvegardes de fichiers mesurées par main.py (famille 'persistence')"""
+    import metrics
+    return sum(h.count for (name, label), h in metrics.HISTOGRAMS.items()
+               if name == 'persistence' and label and label.startswith('save_'))
+
+class Driver:
+    """Construit les updates comme le ferait Telegram et les fait traiter par l'application"""
+
+    def __init__(self, application, request):
+        self.application = application
+        self.request = request
+        self.update_ids = count(1)
+        self.user_message_ids = count(1)
+        self.latencies = []
+
+    @staticmethod
+    def user(user_id):
+        return {'id': user_id, 'is_bot': False, 'first_name': f'Client{user_id}', 'username': f'client{user_id}'}
+
+    @staticmethod
+    def chat(chat_id):
+        return {'id': chat_id, 'type': 'private' if chat_id > 0 else 'supergroup'}
+
+    async def dispatch(self, data):
+        update = Update.de_json(data, self.application.bot)
+        start = time.perf_counter()
+        await self.application.process_update(update)
+        self.latencies.append(time.perf_counter() - start)
+
+    def _message(self, user_id, chat_id, **fields):
+        return {
+            'update_id': next(self.update_ids),
+            'message': dict(
+                message_id=next(self.user_message_ids),
+                date=int(time.time()),
+                chat=self.chat(chat_id),
+                **{'from': self.user(user_id)},
+                **fields
+            ),
+        }
+
+    async def command(self, user_id, chat_id, text):
+        command = text.split()[0]
+        await self.dispatch(self._message(
+            user_id, chat_id, text=text,
+            entities=[{'type': 'bot_command', 'offset': 0, 'length': len(command)}]
+        ))
+
+    async def text(self, user_id, chat_id, text):
+        await self.dispatch(self._message(user_id, chat_id, text=text))
+
+    async def photo(self, user_id, chat_id):
+        message_id = next(self.user_message_ids)
+        await self.dispatch(self._message(
+            user_id, chat_id,
+            photo=[{'file_id': f'upload{message_id}', 'file_unique_id': f'u{message_id}', 'width': 800, 'height': 600}]
+        ))
+
+    async def click(self, user_id, chat_id, prefix, index=0):
+        """Clique sur un bouton du dernier clavier affiché, retourne False s'il n'existe pas"""
+        found = self.request.find_button(chat_id, prefix, index)
+        if not found:
+            return False
+        message_id, kind, callback_data = found
+        message = self.request._message(chat_id, message_id, {}, kind)
+        await self.dispatch({
+            'update_id': next(self.update_ids),
+            'callback_query': {
+                'id': str(next(self.update_ids)),
+                'from': self.user(user_id),
+                'chat_instance': str(chat_id),
+                'data': callback_data,
+                'message': message,
+            },
+        })
+        return True
+
+# Scénarios : (driver, numéro de tour, contexte) -> parcours d'un utilisateur
+
+async def browse(driver, round_number, setup):
+    """Accueil, liste des catégories, chaque catégorie puis un produit, retour"""
+    user_id = 100_000 + round_number
+    await driver.command(user_id, user_id, '/start')
+    await driver.click(user_id, user_id, 'show_categories')
+    for i in range(setup['categories']):
+        if not await driver.click(user_id, user_id, 'view_', i):
+            break
+        if await driver.click(user_id, user_id, 'product_', round_number):
+            # Retour de la fiche produit vers la liste des produits
+            await driver.click(user_id, user_id, 'view_')
+        await driver.click(user_id, user_id, 'show_categories')
+
+async def swipe(driver, round_number, setup):
+    """Ouverture d'un produit avec médias puis navigation dans le carrousel"""
+    user_id = 200_000 + round_number
+    await driver.command(user_id, user_id, '/start')
+    await driver.click(user_id, user_id, 'show_categories')
+    await driver.click(user_id, user_id, f"view_{setup['media_category']}")
+    await driver.click(user_id, user_id, f"product_{setup['media_category'][:10]}_{setup['media_product'][:20]}")
+    for _ in range(10):
+        # Le dernier bouton "media_" est "Suivant"
+        if not await driver.click(user_id, user_id, 'media_', -1):
+            break
+
+async def admin_create(driver, round_number, setup):
+    """Création complète d'un produit par un administrateur"""
+    admin_id = setup['admin_id']
+    await driver.command(admin_id, admin_id, '/admin')
+    await driver.click(admin_id, admin_id, 'add_product')
+    await driver.click(admin_id, admin_id, 'select_category_')
+    await driver.text(admin_id, admin_id, f'Produit bench {round_number} 🌿')
+    await driver.text(admin_id, admin_id, f'{10 + round_number}€')
+    await driver.text(admin_id, admin_id, 'Description générée par le benchmark')
+    await driver.photo(admin_id, admin_id)
+    await driver.photo(admin_id, admin_id)
+    await driver.click(admin_id, admin_id, 'finish_media')
+
+async def dice_duel(driver, round_number, setup):
+    """Un pari /dice dans le groupe, rejoint par un second joueur"""
+    host_id, guest_id = setup['players']
+    await driver.command(host_id, GROUP_CHAT_ID, '/dice 100')
+    await driver.click(guest_id, GROUP_CHAT_ID, 'join')
+
+async def broadcast(driver, round_number, setup):
+    """Diffusion d'un message à tous les utilisateurs enregistrés"""
+    admin_id = setup['admin_id']
+    await driver.command(admin_id, admin_id, '/admin')
+    if await driver.click(admin_id, admin_id, 'start_broadcast'):
+        await driver.text(admin_id, admin_id, f'Annonce {round_number} 📣')
+
+SCENARIOS = {
+    'browse': browse,
+    'swipe': swipe,
+    'admin_create': admin_create,
+    'dice': dice_duel,
+    'broadcast': broadcast,
+}
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+def prepare_workdir(catalog_path=None):
+    """Copie config/ et data/ dans un dossier temporaire qui devient le dossier courant"""
+    workdir = tempfile.mkdtemp(prefix='bot-bench-')
+    for folder in ('config', 'data'):
+        source = os.path.join(ROOT, folder)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(workdir, folder))
+    if catalog_path:
+        with open(os.path.join(workdir, 'config', 'config.json'), encoding='utf-8-sig') as f:
+            catalog_file = json.load(f)['catalog_file']
+        shutil.copy(catalog_path, os.path.join(workdir, catalog_file))
+    os.chdir(workdir)
+    return workdir
+
+def build_setup(main):
+    categories = [c for c in main.CATALOG if c != 'stats']
+    media_category, media_product = next(
+        ((c, p.name) for c in categories for p in main.CATALOG[c] if len(p.media or ()) > 1),
+        (categories[0] if categories else '', '')
+    )
+    return {
+        'categories': len(categories),
+        'media_category': media_category,
+        'media_product': media_product,
+        'admin_id': int(main.ADMIN_IDS[0]),
+        'players': (300_001, 300_002),
+    }
+
+async def run(rounds, scenario_names):
+    import main
+    import dice
+    try:
+        from handlers.admin_features import AdminFeatures
+    except ModuleNotFoundError:
+        # Module hors du dépôt : remplaçant des benchmarks
+        from fake_admin import AdminFeatures
+    from persistence import SQLitePersistence
+    from utils import db
+
+    # Seules les erreurs des handlers restent affichées
+    logging.getLogger().setLevel(logging.WARNING)
+    main.init_catalog()
+
+    request = FakeRequest()
+    application = (
+        Application.builder()
+        .token('123456:BENCHMARK')
+        .request(request)
+        .get_updates_request(FakeRequest())
+        .persistence(SQLitePersistence('bot_state.db'))
+        .build()
+    )
+    main.admin_features = AdminFeatures()
+    main.register_handlers(application)
+    dice.register_dice_handlers(application)
+    application.add_handler(CallbackQueryHandler(dice.dice_button_handler, pattern='^(join|cancel)$'))
+
+    setup = build_setup(main)
+    for player_id in setup['players']:
+        db.cursor.execute('INSERT OR REPLACE INTO users (user_id, username, balance) VALUES (?, ?, ?)',
+                          (player_id, f'joueur{player_id}', 10 ** 9))
+    db.conn.commit()
+
+    await application.initialize()
+    # Comme dans post_init : tâche de fond non attendue à l'arrêt
+    main.DELETION_QUEUE.start(application)
+    driver = Driver(application, request)
+
+    print(f"{'scénario':<14}{'updates':>8}{'upd/s':>9}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'API/upd':>9}{'écrit./upd':>11}{'octets/upd':>12}")
+    try:
+        for name in scenario_names:
+            scenario = SCENARIOS[name]
+            driver.latencies = []
+            calls_before = sum(request.calls.values())
+            saves_before = disk_saves()
+            bytes_before = disk_bytes_written()
+
+            for round_number in range(rounds):
+                await scenario(driver, round_number, setup)
+            await application.update_persistence()
+            # Laisser la file de suppression envoyer ses lots
+            await asyncio.sleep(main.DELETION_QUEUE.batch_delay * 2)
+
+            updates = len(driver.latencies)
+            if not updates:
+                print(f"{name:<14}{'aucun update traité':>30}")
+                continue
+            latencies = sorted(driver.latencies)
+            calls = sum(request.calls.values()) - calls_before
+            saves = disk_saves() - saves_before
+            bytes_written = disk_bytes_written()
+            written = f"{(bytes_written - bytes_before) / updates:12.0f}" if bytes_before is not None else f"{'n/d':>12}"
+            print(
+                f"{name:<14}{updates:>8}{updates / sum(latencies):>9.0f}"
+                f"{percentile(latencies, 50) * 1000:>9.2f}{percentile(latencies, 99) * 1000:>9.2f}"
+                f"{calls / updates:>9.2f}{saves / updates:>11.2f}{written}"
+            )
+    finally:
+        await application.shutdown()
+
+    print("\nAppels API par méthode:")
+    for endpoint, calls in request.calls.most_common():
+        print(f"  {endpoint:<24}{calls:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=50, help="nombre de parcours par scénario")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help="scénario à lancer (tous par défaut)")
+    parser.add_argument('--catalog', help="catalogue à utiliser à la place de config/catalog.json")
+    args = parser.parse_args()
+
+    catalog_path = os.path.abspath(args.catalog) if args.catalog else None
+    workdir = prepare_workdir(catalog_path)
+    try:
+        asyncio.run(run(args.rounds, args.scenario or list(SCENARIOS)))
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Mémoire occupée par les user_data de 100 000 utilisateurs simulés,
+avant (objets PTB gardés en session) et après (IDs et enregistrements __slots__).
+
+Usage: python benchmarks/session_memory.py [nombre d'utilisateurs]
+"""
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import Chat, InlineKeyboardButton, Message
+from session import CategoryView, MessageRef
+
+PRODUCTS_PER_PAGE = 8
+# Seuls les administrateurs (les quelques admin_ids de config.json) gardent un message de
+# bannière en session, entre la demande de nouvelle image et son envoi (edit_banner_image)
+ADMINS = 5
+
+def session_before(user_id):
+    """Contenu typique de user_data avant : clavier complet et objet Message"""
+    category = f"Catégorie {user_id % 50}"
+    keyboard = [
+        [InlineKeyboardButton(f"Produit {i}", callback_data=f"product_{category[:10]}_Produit {i}")]
+        for i in range(PRODUCTS_PER_PAGE)
+    ]
+    keyboard.append([InlineKeyboardButton("🔙 Retour au menu", callback_data="show_categories")])
+    session = {
+        'menu_message_id': 1000 + user_id,
+        'banner_message_id': 2000 + user_id,
+        'category_message_id': 3000 + user_id,
+        'category_message_text': f"*{category}*\n\n",
+        'category_message_reply_markup': keyboard,
+    }
+    if user_id < ADMINS:
+        chat = Chat(id=user_id, type=Chat.PRIVATE)
+        session['banner_msg'] = Message(message_id=4000 + user_id, date=datetime.now(), chat=chat, text="📸 Veuillez envoyer la nouvelle image bannière :")
+    return session
+
+def session_after(user_id):
+    """Contenu de user_data après : uniquement des IDs et des enregistrements compacts"""
+    category = f"Catégorie {user_id % 50}"
+    session = {
+        'menu_message_id': 1000 + user_id,
+        'banner_message_id': 2000 + user_id,
+        'category_message_id': 3000 + user_id,
+        'category_view': CategoryView(category, 0),
+    }
+    if user_id < ADMINS:
+        session['banner_msg'] = MessageRef(user_id, 4000 + user_id)
+    return session
+
+def measure(build, users):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sessions = {user_id: build(user_id) for user_id in range(users)}
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del sessions
+    return total
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for label, build in (("avant", session_before), ("après", session_after)):
+        total = measure(build, users)
+        print(f"{label:>6}: {total / 1024 / 1024:8.1f} Mo au total, {total / users:8.0f} octets par utilisateur")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Temps de démarrage du bot : profil des imports (python -X importtime) et temps
+jusqu'au traitement du premier update (/start), phase par phase.
+
+Chaque mesure est faite dans un nouveau processus, dans une copie temporaire
+de config/ et data/. Le Bot est remplacé par le faux Bot de replay.py.
+
+Usage: python benchmarks/startup.py [--repeat N] [--top N] [--catalog fichier.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def first_update():
+    """Exécuté dans le processus enfant : démarre le bot comme main() et traite un /start"""
+    timings = {}
+    start = time.perf_counter()
+
+    import main
+    timings['import main'] = time.perf_counter() - start
+
+    phase = time.perf_counter()
+    from telegram.ext import Application
+    try:
+        from handlers.admin_features import AdminFeatures
+    except ModuleNotFoundError:
+        # Module hors du dépôt : remplaçant des benchmarks
+        from fake_admin import AdminFeatures
+    from persistence import SQLitePersistence
+    from replay import Driver, FakeRequest
+
+    main.start_catalog_loading()
+    request = FakeRequest()
+    application = (
+        Application.builder()
+        .token('123456:BENCHMARK')
+        .request(request)
+        .get_updates_request(FakeRequest())
+        .persistence(SQLitePersistence('bot_state.db'))
+        .build()
+    )
+    main.admin_features = AdminFeatures()
+    main.register_handlers(application)
+    await application.initialize()
+    # Ce que fait run_polling avant de recevoir le premier update
+    await main.start_background_tasks(application)
+    timings['initialisation'] = time.perf_counter() - phase
+
+    phase = time.perf_counter()
+    user_id = 424242
+    await Driver(application, request).command(user_id, user_id, '/start')
+    timings['premier update'] = time.perf_counter() - phase
+
+    timings['total'] = time.perf_counter() - start
+    return timings
+
+def run_child(workdir, importtime=False):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += [os.path.abspath(__file__), '--child']
+
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['processus complet'] = wall
+    return timings, result.stderr
+
+def parse_importtime(stderr):
+    """(cumul en µs, module) des imports de premier niveau et de leurs enfants directs"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        if depth <= 1:
+            entries.append((int(cumulative_us), name.strip(), depth))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="nombre de modules affichés dans le profil")
+    parser.add_argument('--catalog', help="catalogue à utiliser à la place de config/catalog.json")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import logging
+        timings = asyncio.run(first_update())
+        logging.shutdown()
+        print(json.dumps(timings))
+        # Les tâches de fond du bot tournent indéfiniment
+        sys.stdout.flush()
+        os._exit(0)
+
+    sys.path.insert(0, ROOT)
+    from replay import prepare_workdir
+    workdir = prepare_workdir(os.path.abspath(args.catalog) if args.catalog else None)
+    os.chdir(ROOT)
+    try:
+        _, stderr = run_child(workdir, importtime=True)
+        entries = parse_importtime(stderr)
+        print(f"Profil des imports (cumul, -X importtime), {args.top} plus coûteux :")
+        for cumulative_us, name, depth in sorted(entries, reverse=True)[:args.top]:
+            print(f"  {cumulative_us / 1000:9.1f} ms  {'  ' * depth}{name}")
+
+        runs = [run_child(workdir)[0] for _ in range(args.repeat)]
+        print(f"\nTemps jusqu'au premier update (médiane sur {args.repeat} processus) :")
+        for phase in runs[0]:
+            print(f"  {phase:<20}{statistics.median(run[phase] for run in runs) * 1000:9.1f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
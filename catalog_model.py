@@ -0,0 +1,261 @@
+import gc
+import os
+import pickle
+import sys
+from contextlib import contextmanager
+from enum import Enum
+
+class MediaType(str, Enum):
+    """Type d'un média ; hérite de str pour rester comparable à 'photo' / 'video'"""
+    PHOTO = 'photo'
+    VIDEO = 'video'
+
+# Membres en constantes de module : MediaType.PHOTO passe par la métaclasse d'Enum, bien plus lent
+PHOTO = MediaType.PHOTO
+VIDEO = MediaType.VIDEO
+_MEDIA_TYPES = {member.value: member for member in MediaType}
+
+@contextmanager
+def _gc_paused():
+    """
+    Suspend le ramasse-miettes cyclique pendant la création ou le parcours de tout le catalogue :
+    ces centaines de milliers d'objets déclenchent sinon des passes complètes inutiles (pas de cycles)
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Record:
+    """
+    Base des enregistrements du catalogue. Les champs sont des attributs (__slots__),
+    un champ absent du JSON vaut None. L'accès par clé (product['name'], product.get('media'))
+    reste possible pour le code qui manipule encore les produits comme des dicts.
+    Les clés inconnues du JSON sont conservées dans `extra` pour être réécrites telles quelles.
+    """
+    __slots__ = ()
+    FIELDS = ()
+    FIELD_SET = frozenset()
+    # Champs dont les valeurs se répètent d'un produit à l'autre : une seule copie en mémoire
+    INTERNED = ()
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, _intern(value) if key in self.INTERNED else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.FIELDS if getattr(self, field) is not None)
+        return f"{type(self).__name__}({fields})"
+
+    @classmethod
+    def _split(cls, data):
+        """Sépare les champs connus des clés inconnues d'un dict du JSON"""
+        if data.keys() <= cls.FIELD_SET:
+            return data, None
+        known = {key: value for key, value in data.items() if key in cls.FIELDS}
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        return known, extra or None
+
+class Media(Record):
+    __slots__ = ('media_id', 'media_type', 'order_index', 'extra')
+    FIELDS = ('media_id', 'media_type', 'order_index')
+    FIELD_SET = frozenset(FIELDS)
+
+    def __init__(self, media_id, media_type, order_index=None, extra=None):
+        self.media_id = media_id
+        self.media_type = _MEDIA_TYPES.get(media_type) or MediaType(media_type)
+        self.order_index = order_index
+        self.extra = extra
+
+    def __reduce__(self):
+        # Pickle compact : les valeurs des champs plutôt qu'un dict d'état par objet
+        return (_restore_media, (self.media_id, self.media_type, self.order_index, self.extra))
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict) or 'media_id' not in data or 'media_type' not in data:
+            raise ValueError(f"Média invalide: {data}")
+        known, extra = cls._split(data)
+        return cls(known['media_id'], known['media_type'], known.get('order_index'), extra)
+
+    def to_dict(self):
+        # MediaType est une str : json l'écrit tel quel ("photo")
+        data = {'media_id': self.media_id, 'media_type': self.media_type}
+        if self.order_index is not None:
+            data['order_index'] = self.order_index
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+class Product(Record):
+    __slots__ = ('name', 'price', 'description', 'media', 'view_mode', 'extra')
+    FIELDS = ('name', 'price', 'description', 'media', 'view_mode')
+    FIELD_SET = frozenset(FIELDS)
+    INTERNED = ('name', 'price', 'view_mode')
+
+    def __init__(self, name, price=None, description=None, media=None, view_mode=None, extra=None):
+        self.name = sys.intern(name)
+        self.price = _intern(price)
+        self.description = description
+        # Médias triés une fois pour toutes ; None si le produit n'en a jamais eu
+        self.media = None if media is None else tuple(sorted(media, key=lambda m: m.order_index or 0))
+        self.view_mode = _intern(view_mode)
+        self.extra = extra
+
+    def __reduce__(self):
+        return (_restore_product, (self.name, self.price, self.description, self.media, self.view_mode, self.extra))
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict) or not isinstance(data.get('name'), str):
+            raise ValueError(f"Produit invalide: {data}")
+        known, extra = cls._split(data)
+        media = known.get('media')
+        if media is not None:
+            media = [Media.from_dict(item) for item in media]
+        return cls(known['name'], known.get('price'), known.get('description'), media, known.get('view_mode'), extra)
+
+    def to_dict(self):
+        data = {'name': self.name}
+        if self.price is not None:
+            data['price'] = self.price
+        if self.description is not None:
+            data['description'] = self.description
+        if self.media is not None:
+            data['media'] = [media.to_dict() for media in self.media]
+        if self.view_mode is not None:
+            data['view_mode'] = self.view_mode
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+# Reconstruction depuis un snapshot : les valeurs sont déjà validées, triées et partagées
+# (le pickle garde une seule copie de chaque chaîne), __init__ est court-circuité
+def _restore_media(media_id, media_type, order_index, extra):
+    media = object.__new__(Media)
+    media.media_id = media_id
+    media.media_type = media_type
+    media.order_index = order_index
+    media.extra = extra
+    return media
+
+def _restore_product(name, price, description, media, view_mode, extra):
+    product = object.__new__(Product)
+    product.name = name
+    product.price = price
+    product.description = description
+    product.media = media
+    product.view_mode = view_mode
+    product.extra = extra
+    return product
+
+def _intern_stats(stats):
+    """Les clés des statistiques partagent les chaînes des noms de catégories et de produits"""
+    if not isinstance(stats, dict):
+        return stats
+    stats = dict(stats)
+    if isinstance(stats.get('category_views'), dict):
+        stats['category_views'] = {sys.intern(category): views for category, views in stats['category_views'].items()}
+    if isinstance(stats.get('product_views'), dict):
+        stats['product_views'] = {
+            sys.intern(category): {sys.intern(name): views for name, views in products.items()}
+            for category, products in stats['product_views'].items()
+        }
+    return stats
+
+def catalog_from_json(data):
+    """
+    Convertit le contenu de catalog.json en catalogue typé :
+    catégorie -> liste de Product, plus l'entrée 'stats' gardée en dict.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Le catalogue doit être un objet JSON")
+    with _gc_paused():
+        return _convert_catalog(data)
+
+def _convert_catalog(data):
+    catalog = {}
+    for category, products in data.items():
+        if category == 'stats':
+            catalog['stats'] = _intern_stats(products)
+            continue
+        if not isinstance(products, list):
+            raise ValueError(f"La catégorie {category} doit être une liste de produits")
+        try:
+            catalog[sys.intern(category)] = [Product.from_dict(product) for product in products]
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Produit invalide dans la catégorie {category}: {e}") from e
+    return catalog
+
+def catalog_to_json(catalog):
+    """Inverse de catalog_from_json : le dict à écrire dans catalog.json"""
+    return {
+        category: products if category == 'stats' else [product.to_dict() for product in products]
+        for category, products in catalog.items()
+    }
+
+# Snapshot binaire du catalogue typé : en-tête (magie + version du schéma) puis pickle protocole 5.
+# La version est à incrémenter à chaque changement des champs de Product ou Media.
+SNAPSHOT_MAGIC = b'CATALOG\0'
+SNAPSHOT_VERSION = 1
+
+def write_snapshot(path, catalog):
+    """Écrit le snapshot dans un fichier temporaire puis le renomme (jamais de fichier à moitié écrit)"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f, _gc_paused():
+        f.write(SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION]))
+        pickle.dump(catalog, f, protocol=5)
+    os.replace(temp_path, path)
+
+def read_snapshot(path):
+    """
+    Relit un snapshot écrit par write_snapshot. ValueError si le fichier n'en est pas un
+    ou date d'une autre version du schéma. Ne charger que des fichiers écrits par le bot (pickle).
+    """
+    with open(path, 'rb') as f:
+        header = f.read(len(SNAPSHOT_MAGIC) + 1)
+        if header[:-1] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} n'est pas un snapshot du catalogue")
+        if header[-1] != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot {path} en version {header[-1]}, version attendue {SNAPSHOT_VERSION}")
+        with _gc_paused():
+            return pickle.load(f)
+
+def snapshot_is_current(snapshot_path, json_path):
+    """Le snapshot existe et n'est pas plus ancien que le JSON (sinon le JSON a été modifié à la main)"""
+    try:
+        snapshot_mtime = os.stat(snapshot_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    try:
+        return snapshot_mtime >= os.stat(json_path).st_mtime_ns
+    except FileNotFoundError:
+        return True
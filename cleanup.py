@@ -0,0 +1,90 @@
+import logging
+import asyncio
+from telegram.error import BadRequest, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximum de messages par appel deleteMessages
+MAX_BULK_DELETE = 100
+
+class DeletionQueue:
+    """
+    File de suppression de messages exécutée en arrière-plan.
+    Les handlers appellent schedule() sans attendre : les suppressions sont
+    regroupées par chat (deleteMessages, 100 messages par appel) et relancées
+    en cas d'erreur temporaire. Le débit est limité par BotRateLimiter.
+    """
+
+    def __init__(self, batch_delay=0.3, max_attempts=3):
+        self.batch_delay = batch_delay
+        self.max_attempts = max_attempts
+        self.pending = {}
+        self.attempts = {}
+        self.wakeup = None
+        self.bot = None
+
+    def start(self, application):
+        """Démarre le traitement de la file (à appeler dans post_init)"""
+        self.bot = application.bot
+        self.wakeup = asyncio.Event()
+        if self.pending:
+            self.wakeup.set()
+        application.create_task(self.run())
+
+    def schedule(self, chat_id, message_id):
+        """Ajoute un message à supprimer, sans bloquer le handler"""
+        if message_id is None:
+            return
+        self.pending.setdefault(chat_id, set()).add(message_id)
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    def schedule_many(self, chat_id, message_ids):
+        for message_id in message_ids:
+            self.schedule(chat_id, message_id)
+
+    def schedule_later(self, delay, chat_id, message_id):
+        """Programme la suppression d'un message dans `delay` secondes (message de confirmation temporaire)"""
+        asyncio.get_running_loop().call_later(delay, self.schedule, chat_id, message_id)
+
+    async def run(self):
+        while True:
+            await self.wakeup.wait()
+            # Laisser le temps aux suppressions d'un même échange de s'accumuler
+            await asyncio.sleep(self.batch_delay)
+            self.wakeup.clear()
+
+            pending, self.pending = self.pending, {}
+            for chat_id, message_ids in pending.items():
+                message_ids = sorted(message_ids)
+                for i in range(0, len(message_ids), MAX_BULK_DELETE):
+                    await self._delete(chat_id, message_ids[i:i + MAX_BULK_DELETE])
+
+    async def _delete(self, chat_id, message_ids):
+        try:
+            if len(message_ids) > 1 and hasattr(self.bot, 'delete_messages'):
+                await self.bot.delete_messages(chat_id=chat_id, message_ids=message_ids)
+            else:
+                for message_id in message_ids:
+                    try:
+                        await self.bot.delete_message(chat_id=chat_id, message_id=message_id)
+                    except BadRequest:
+                        # Message déjà supprimé ou trop ancien
+                        pass
+        except RetryAfter as e:
+            delay = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+            await asyncio.sleep(delay)
+            self._retry(chat_id, message_ids)
+        except BadRequest as e:
+            logger.warning(f"Suppression impossible dans le chat {chat_id}: {e}")
+        except Exception as e:
+            logger.error(f"Erreur lors de la suppression de messages dans le chat {chat_id}: {e}")
+            self._retry(chat_id, message_ids)
+
+    def _retry(self, chat_id, message_ids):
+        key = (chat_id, message_ids[0])
+        self.attempts[key] = self.attempts.get(key, 0) + 1
+        if self.attempts[key] >= self.max_attempts:
+            del self.attempts[key]
+            return
+        self.schedule_many(chat_id, message_ids)
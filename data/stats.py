@@ -1,79 +1,160 @@
-﻿import json
+﻿import logging
+import json
+import os
 from datetime import datetime
 
-# Charger les statistiques depuis le fichier
-def load_stats(file_path='data/stats.json'):
+logger = logging.getLogger(__name__)
+
+# Nombre d'incréments journalisés avant de réécrire le fichier complet
+COMPACT_EVERY = 1000
+
+# Statistiques vides
+def empty_stats():
+    return {
+        'total_views': 0,
+        'category_views': {},
+        'product_views': {},
+        'last_updated': datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        'last_reset': datetime.utcnow().strftime("%Y-%m-%d")
+    }
+
+# Lire le fichier de statistiques
+def read_stats_file(file_path):
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except FileNotFoundError:
-        return {
-            'total_views': 0,
-            'category_views': {},
-            'product_views': {},
-            'last_updated': datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-            'last_reset': datetime.utcnow().strftime("%Y-%m-%d")
-        }
+        return empty_stats()
+
+# Compteurs de vues gardés en mémoire.
+# Chaque incrément est ajouté à un journal (une ligne JSON numérotée) ;
+# le fichier complet n'est réécrit que tous les COMPACT_EVERY incréments.
+# Au démarrage, le journal est rejoué sur le fichier complet en ignorant
+# les lignes déjà incluses (numéro <= 'log_seq' du fichier).
+class StatsStore:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.log_path = os.path.splitext(file_path)[0] + '.log'
+        self.log = None
+        self.stats = read_stats_file(file_path)
+        self.seq = self.stats.get('log_seq', 0)
+        self.pending = self.replay_log()
+
+    # Rejouer les incréments journalisés après la dernière sauvegarde complète
+    def replay_log(self):
+        replayed = 0
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        seq, category, product_name, timestamp = json.loads(line)
+                    except (ValueError, TypeError):
+                        # Ligne tronquée par un arrêt brutal
+                        continue
+                    if seq <= self.stats.get('log_seq', 0):
+                        continue
+                    self.apply(category, product_name, timestamp)
+                    self.seq = max(self.seq, seq)
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        return replayed
+
+    def apply(self, category, product_name, timestamp):
+        products = self.stats.setdefault('product_views', {}).setdefault(category, {})
+        products[product_name] = products.get(product_name, 0) + 1
+        self.stats['total_views'] = self.stats.get('total_views', 0) + 1
+        self.stats['last_updated'] = timestamp
+
+    def increment(self, category, product_name):
+        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        self.apply(category, product_name, timestamp)
+
+        self.seq += 1
+        if self.log is None:
+            self.log = open(self.log_path, 'a', encoding='utf-8', buffering=1)
+        self.log.write(json.dumps([self.seq, category, product_name, timestamp], ensure_ascii=False) + '\n')
+
+        self.pending += 1
+        if self.pending >= COMPACT_EVERY:
+            self.save()
+
+    # Réécrire le fichier complet puis vider le journal
+    def save(self):
+        self.stats['log_seq'] = self.seq
+        temp_path = self.file_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.stats, f, indent=4, ensure_ascii=False)
+        os.replace(temp_path, self.file_path)
+
+        if self.log is not None:
+            self.log.close()
+        self.log = open(self.log_path, 'w', encoding='utf-8', buffering=1)
+        self.pending = 0
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+# Un store par fichier de statistiques, créé au premier accès
+STORES = {}
+
+def get_store(file_path='data/stats.json'):
+    store = STORES.get(file_path)
+    if store is None:
+        store = STORES[file_path] = StatsStore(file_path)
+    return store
+
+# Charger les statistiques (depuis la mémoire après le premier accès)
+def load_stats(file_path='data/stats.json'):
+    return get_store(file_path).stats
 
 # Sauvegarder les statistiques dans le fichier
 def save_stats(stats, file_path='data/stats.json'):
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(stats, f, indent=4, ensure_ascii=False)
+    store = get_store(file_path)
+    store.stats = stats
+    store.save()
 
 # Nettoyer les statistiques des produits et catégories qui n'existent plus
+# Retourne True si des statistiques ont été supprimées (le fichier n'est réécrit que dans ce cas)
 def clean_stats(catalog, stats):
+    removed = False
+
     # Nettoyer les vues par catégorie
-    if 'category_views' in stats:
-        categories_to_remove = []
-        for category in stats['category_views']:
-            if category not in catalog:
-                categories_to_remove.append(category)
-        
-        for category in categories_to_remove:
-            del stats['category_views'][category]
-            print(f"🧹 Suppression des stats de la catégorie: {category}")
+    category_views = stats.get('category_views')
+    if category_views:
+        for category in [c for c in category_views if c not in catalog]:
+            del category_views[category]
+            removed = True
+            logger.info(f"🧹 Suppression des stats de la catégorie: {category}")
 
     # Nettoyer les vues par produit
-    if 'product_views' in stats:
-        categories_to_remove = []
-        for category in stats['product_views']:
+    product_views = stats.get('product_views')
+    if product_views:
+        for category in list(product_views):
             if category not in catalog:
-                categories_to_remove.append(category)
+                del product_views[category]
+                removed = True
                 continue
-            
-            products_to_remove = []
-            existing_products = [p['name'] for p in catalog[category]]
-            
-            for product_name in stats['product_views'][category]:
-                if product_name not in existing_products:
-                    products_to_remove.append(product_name)
-            
-            for product in products_to_remove:
-                del stats['product_views'][category][product]
-                print(f"🧹 Suppression des stats du produit: {product} dans {category}")
-            
-            if not stats['product_views'][category]:
-                categories_to_remove.append(category)
-        
-        for category in categories_to_remove:
-            if category in stats['product_views']:
-                del stats['product_views'][category]
-
-    stats['last_updated'] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    save_stats(stats)
-
-# Incrémenter les statistiques pour un produit
+
+            existing_products = {p['name'] for p in catalog[category]}
+            products = product_views[category]
+
+            for product in [p for p in products if p not in existing_products]:
+                del products[product]
+                removed = True
+                logger.info(f"🧹 Suppression des stats du produit: {product} dans {category}")
+
+            if not products:
+                del product_views[category]
+                removed = True
+
+    if removed:
+        stats['last_updated'] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        save_stats(stats)
+    return removed
+
+# Incrémenter les statistiques pour un produit (en mémoire + une ligne de journal)
 def increment_product_views(catalog, category, product_name):
-    stats = load_stats()
-    
-    if 'product_views' not in stats:
-        stats['product_views'] = {}
-    if category not in stats['product_views']:
-        stats['product_views'][category] = {}
-    if product_name not in stats['product_views'][category]:
-        stats['product_views'][category][product_name] = 0
-
-    stats['product_views'][category][product_name] += 1
-    stats['total_views'] += 1
-    stats['last_updated'] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    save_stats(stats)
\ No newline at end of file
+    get_store().increment(category, product_name)
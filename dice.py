@@ -6,10 +6,6 @@ from telegram.ext import CommandHandler, ContextTypes
 from telegram.constants import ParseMode
 from utils import db, is_admin
 
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
 logger = logging.getLogger(__name__)
 
 # Utilise la même variable que le main.py
@@ -0,0 +1,34 @@
+import heapq
+
+class Leaderboard:
+    """
+    Classement borné des K éléments les plus vus.
+    Les compteurs ne font qu'augmenter : un élément hors du classement n'y entre
+    que s'il dépasse le plus petit élément classé, ce qui garde le classement exact.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.members = {}
+
+    def clear(self):
+        self.members = {}
+
+    def rebuild(self, counts):
+        """Reconstruit le classement à partir d'un itérable de (clé, compteur)"""
+        self.members = dict(heapq.nlargest(self.size, counts, key=lambda item: item[1]))
+
+    def update(self, key, count):
+        """Prend en compte la nouvelle valeur du compteur d'une clé"""
+        if key in self.members or len(self.members) < self.size:
+            self.members[key] = count
+            return
+
+        lowest = min(self.members, key=self.members.get)
+        if count > self.members[lowest]:
+            del self.members[lowest]
+            self.members[key] = count
+
+    def items(self):
+        """Retourne les (clé, compteur) classés du plus vu au moins vu"""
+        return sorted(self.members.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,93 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+
+# Attributs standard d'un LogRecord : tout le reste provient de `extra=` et est exporté tel quel
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Niveaux par défaut des bibliothèques trop bavardes
+DEFAULT_LEVELS = {
+    'httpx': 'WARNING',
+    'apscheduler': 'WARNING',
+}
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement, avec les champs passés via extra="""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class DebugSampler(logging.Filter):
+    """Ne laisse passer qu'un message DEBUG sur `every` : pour les chemins appelés à chaque update"""
+
+    def __init__(self, every=100):
+        super().__init__()
+        self.every = every
+        self.seen = 0
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        self.seen += 1
+        if self.seen % self.every:
+            return False
+        record.sampled_every = self.every
+        return True
+
+def get_hot_logger(name, every=100):
+    """Logger des chemins chauds : ses messages DEBUG sont échantillonnés"""
+    logger = logging.getLogger(f'{name}.hot')
+    if not any(isinstance(f, DebugSampler) for f in logger.filters):
+        logger.addFilter(DebugSampler(every))
+    return logger
+
+def set_levels(levels):
+    """Applique des niveaux par module, ex: {"main": "DEBUG", "httpx": "WARNING"}"""
+    for name, level in (levels or {}).items():
+        logging.getLogger(name).setLevel(level.upper() if isinstance(level, str) else level)
+
+_listener = None
+
+def setup_logging(log_file='bot.log', level=logging.INFO, max_bytes=5 * 1024 * 1024, backup_count=5):
+    """
+    Les handlers ne font que déposer les enregistrements dans une file :
+    l'écriture (fichier JSON avec rotation, console) se fait dans le thread du QueueListener
+    et ne bloque jamais la boucle d'événements.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    set_levels(DEFAULT_LEVELS)
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
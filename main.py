@@ -1,13 +1,15 @@
-from handlers.admin_features import AdminFeatures
 import json
 import logging
 import asyncio
 import shutil
 import os
 import re
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time
+from time import perf_counter
 import pytz
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, InputMediaVideo
 from telegram.ext import (
     Application, 
     CommandHandler, 
@@ -15,116 +17,254 @@ from telegram.ext import (
     MessageHandler, 
     filters, 
     ContextTypes, 
-    ConversationHandler
+    ConversationHandler,
+    TypeHandler
 )
+from pagination import paginated_keyboard, parse_page_callback
+from search import SearchIndex
+from leaderboard import Leaderboard
+from timeline import ViewTimeline
+from catalog_model import (
+    Product, Media, PHOTO, catalog_from_json, catalog_to_json,
+    read_snapshot, write_snapshot, snapshot_is_current
+)
+from watcher import FileWatcher
+from persistence import SQLitePersistence
+from session import MessageRef, CategoryView, SessionTracker
+from cleanup import DeletionQueue
+from ratelimit import BotRateLimiter
+from logging_setup import setup_logging, get_hot_logger, set_levels
+import metrics
+from metrics import timed
 paris_tz = pytz.timezone('Europe/Paris')
 
-STATS_CACHE = None
-LAST_CACHE_UPDATE = None
 admin_features = None
 
-# Désactiver les logs de httpx
-logging.getLogger("httpx").setLevel(logging.WARNING)
-
-# Configuration du logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO,
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configuration du logging : file non bloquante, fichier JSON avec rotation (bot.log)
+setup_logging('bot.log')
 logger = logging.getLogger(__name__)
+hot_logger = get_hot_logger(__name__)
+
+CONFIG_FILE = 'config/config.json'
 
 # Charger la configuration
 try:
-    with open('config/config.json', 'r', encoding='utf-8') as f:
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
         CONFIG = json.load(f)
         TOKEN = CONFIG['token']
         ADMIN_IDS = CONFIG['admin_ids']
 except FileNotFoundError:
-    print("Erreur: Le fichier config.json n'a pas été trouvé!")
+    logger.critical("Erreur: Le fichier config.json n'a pas été trouvé!")
     exit(1)
 except KeyError as e:
-    print(f"Erreur: La clé {e} est manquante dans le fichier config.json!")
+    logger.critical(f"Erreur: La clé {e} est manquante dans le fichier config.json!")
     exit(1)
 
+# Niveaux de log par module, ex: "log_levels": {"main": "DEBUG", "main.hot": "DEBUG"}
+set_levels(CONFIG.get('log_levels'))
+
+# Mesures de performance (désactivables avec "metrics_enabled": false)
+metrics.set_enabled(CONFIG.get('metrics_enabled', True))
+
+# Surveillance des modifications externes de config.json et catalog.json
+FILE_WATCHER = FileWatcher(interval=5.0)
+
+@timed('persistence')
+def save_config():
+    """Sauvegarde la configuration dans config.json"""
+    # Une modification faite à la main et pas encore rechargée n'est pas écrasée
+    if FILE_WATCHER.changed_outside(CONFIG_FILE):
+        logger.warning(f"⚠️ {CONFIG_FILE} modifié hors du bot : sauvegarde annulée, le fichier va être rechargé")
+        return
+    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump(CONFIG, f, indent=4)
+    FILE_WATCHER.mark_written(CONFIG_FILE)
+
+def read_config_file(path):
+    """Lit et valide un fichier de configuration"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    for key in ('token', 'admin_ids', 'catalog_file'):
+        if key not in config:
+            raise ValueError(f"La clé {key} est manquante")
+    if not isinstance(config['admin_ids'], list):
+        raise ValueError("admin_ids doit être une liste")
+    return config
+
 # Fonctions de gestion du catalogue
+def read_catalog_file(path):
+    """Lit et valide un fichier catalogue et le convertit en catalogue typé (médias triés)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return catalog_from_json(json.load(f))
+
+# Snapshot binaire optionnel, copie de travail du catalogue : "catalog_snapshot": "config/catalog.snapshot"
+# dans config.json. Les sauvegardes n'écrivent alors que le snapshot, catalog_file (JSON lisible et
+# modifiable à la main) devient un export réécrit toutes les CATALOG_EXPORT_INTERVAL secondes et à l'arrêt.
+CATALOG_EXPORT_INTERVAL = 300
+# Des sauvegardes ne sont que dans le snapshot, l'export JSON est en retard
+CATALOG_EXPORT_PENDING = False
+
+@timed('persistence')
 def load_catalog():
+    snapshot = CONFIG.get('catalog_snapshot')
+    # Un JSON plus récent que le snapshot a été modifié à la main : c'est lui qui fait foi
+    if snapshot and snapshot_is_current(snapshot, CONFIG['catalog_file']):
+        try:
+            return read_snapshot(snapshot)
+        except Exception as e:
+            logger.warning(f"Snapshot du catalogue illisible, lecture du JSON: {e}")
     try:
-        with open(CONFIG['catalog_file'], 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_catalog_file(CONFIG['catalog_file'])
     except FileNotFoundError:
         return {}
 
+def write_catalog_json(catalog):
+    """Écrit catalog_file, sauf s'il a été modifié à la main depuis son dernier rechargement (retourne False)"""
+    path = CONFIG['catalog_file']
+    if FILE_WATCHER.changed_outside(path):
+        logger.warning(f"⚠️ {path} modifié hors du bot : sauvegarde annulée, le fichier va être rechargé")
+        return False
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(catalog_to_json(catalog), f, indent=4, ensure_ascii=False)
+    FILE_WATCHER.mark_written(path)
+    return True
+
+@timed('persistence')
 def save_catalog(catalog):
-    with open(CONFIG['catalog_file'], 'w', encoding='utf-8') as f:
-        json.dump(catalog, f, indent=4, ensure_ascii=False)
+    global CATALOG_EXPORT_PENDING
+    snapshot = CONFIG.get('catalog_snapshot')
+    if snapshot:
+        write_snapshot(snapshot, catalog)
+        CATALOG_EXPORT_PENDING = True
+    else:
+        write_catalog_json(catalog)
+
+@timed('persistence')
+def export_catalog():
+    """Réécrit l'export JSON s'il est en retard sur le snapshot"""
+    global CATALOG_EXPORT_PENDING
+    snapshot = CONFIG.get('catalog_snapshot')
+    if not snapshot or not CATALOG_EXPORT_PENDING:
+        return
+    if not write_catalog_json(CATALOG):
+        return
+    # Réécrit après l'export pour rester plus récent que lui (voir load_catalog)
+    write_snapshot(snapshot, CATALOG)
+    CATALOG_EXPORT_PENDING = False
+
+# Version du catalogue, incrémentée à chaque ajout/modification/suppression de catégorie ou de produit
+CATALOG_VERSION = 0
+# Version du catalogue lors du dernier nettoyage des statistiques
+STATS_CLEAN_VERSION = None
+
+# Classements maintenus à chaque vue pour afficher les statistiques sans tout trier :
+# les 5 produits et les 10 catégories les plus vus (les autres catégories sont comptées)
+TOP_PRODUCTS = Leaderboard(5)
+TOP_CATEGORIES = Leaderboard(10)
+
+def catalog_changed():
+    """À appeler après toute modification de la structure du catalogue"""
+    global CATALOG_VERSION
+    CATALOG_VERSION += 1
+    invalidate_render_cache()
 
 def clean_stats():
     """Nettoie les statistiques des produits et catégories qui n'existent plus"""
+    global STATS_CLEAN_VERSION
     if 'stats' not in CATALOG:
         return
-    
+
+    # Rien à nettoyer si le catalogue n'a pas changé depuis le dernier passage
+    if STATS_CLEAN_VERSION == CATALOG_VERSION:
+        return
+    STATS_CLEAN_VERSION = CATALOG_VERSION
+
     stats = CATALOG['stats']
-    
+    removed = False
+
     # Nettoyer les vues par catégorie
-    if 'category_views' in stats:
-        categories_to_remove = []
-        for category in stats['category_views']:
-            if category not in CATALOG or category == 'stats':
-                categories_to_remove.append(category)
-        
-        for category in categories_to_remove:
-            del stats['category_views'][category]
-            print(f"🧹 Suppression des stats de la catégorie: {category}")
+    category_views = stats.get('category_views')
+    if category_views:
+        for category in [c for c in category_views if c not in CATALOG or c == 'stats']:
+            del category_views[category]
+            removed = True
+            logger.info(f"🧹 Suppression des stats de la catégorie: {category}")
 
     # Nettoyer les vues par produit
-    if 'product_views' in stats:
-        categories_to_remove = []
-        for category in stats['product_views']:
+    product_views = stats.get('product_views')
+    if product_views:
+        for category in list(product_views):
             if category not in CATALOG or category == 'stats':
-                categories_to_remove.append(category)
+                del product_views[category]
+                removed = True
                 continue
-            
-            products_to_remove = []
-            existing_products = [p['name'] for p in CATALOG[category]]
-            
-            for product_name in stats['product_views'][category]:
-                if product_name not in existing_products:
-                    products_to_remove.append(product_name)
-            
+
+            existing_products = {p.name for p in CATALOG[category]}
+            products = product_views[category]
+
             # Supprimer les produits qui n'existent plus
-            for product in products_to_remove:
-                del stats['product_views'][category][product]
-                print(f"🧹 Suppression des stats du produit: {product} dans {category}")
-            
-            # Si la catégorie est vide après nettoyage, la marquer pour suppression
-            if not stats['product_views'][category]:
-                categories_to_remove.append(category)
-        
-        # Supprimer les catégories vides
-        for category in categories_to_remove:
-            if category in stats['product_views']:
-                del stats['product_views'][category]
+            for product in [p for p in products if p not in existing_products]:
+                del products[product]
+                removed = True
+                logger.info(f"🧹 Suppression des stats du produit: {product} dans {category}")
+
+            # Supprimer la catégorie si elle est vide après nettoyage
+            if not products:
+                del product_views[category]
+                removed = True
+
+    # Ne réécrire le catalogue que si quelque chose a été supprimé
+    if removed:
+        stats['last_updated'] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        save_catalog(CATALOG)
 
-    # Mettre à jour la date de dernière modification
-    stats['last_updated'] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    save_catalog(CATALOG)
+    # Les classements peuvent contenir des produits supprimés ou renommés
+    rebuild_leaderboards()
 
-def get_stats():
-    global STATS_CACHE, LAST_CACHE_UPDATE
-    current_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Si le cache existe et a moins de 30 secondes
-    if STATS_CACHE and LAST_CACHE_UPDATE and (current_time - LAST_CACHE_UPDATE).seconds < 30:
-        return STATS_CACHE
-        
-    # Sinon, lire le fichier et mettre à jour le cache
-    STATS_CACHE = load_catalog()['stats']
-    LAST_CACHE_UPDATE = current_time
-    return STATS_CACHE
+def ensure_stats():
+    """Initialise les statistiques du catalogue si nécessaire et les retourne"""
+    if 'stats' not in CATALOG:
+        CATALOG['stats'] = {
+            "total_views": 0,
+            "category_views": {},
+            "product_views": {},
+            "last_updated": datetime.now(paris_tz).strftime("%H:%M:%S"),
+            "last_reset": datetime.now(paris_tz).strftime("%Y-%m-%d")
+        }
+    stats = CATALOG['stats']
+    stats.setdefault('total_views', 0)
+    stats.setdefault('category_views', {})
+    stats.setdefault('product_views', {})
+    return stats
+
+def count_category_view(stats, category):
+    """Incrémente les vues d'une catégorie et met à jour le classement"""
+    category_views = stats['category_views']
+    category_views[category] = category_views.get(category, 0) + 1
+    TOP_CATEGORIES.update(category, category_views[category])
+
+def count_product_view(stats, category, product_name):
+    """Incrémente les vues d'un produit et met à jour le classement"""
+    products = stats['product_views'].setdefault(category, {})
+    products[product_name] = products.get(product_name, 0) + 1
+    TOP_PRODUCTS.update((category, product_name), products[product_name])
+
+def record_view(stats):
+    """Enregistre une vue dans le total et dans l'historique horaire/journalier"""
+    stats['total_views'] += 1
+    stats['last_updated'] = datetime.now(paris_tz).strftime("%H:%M:%S")
+    VIEW_TIMELINE.record()
+    stats['timeline'] = VIEW_TIMELINE.to_dict()
+
+def rebuild_leaderboards():
+    """Reconstruit les classements à partir des compteurs complets"""
+    stats = CATALOG.get('stats', {})
+    TOP_CATEGORIES.rebuild(stats.get('category_views', {}).items())
+    TOP_PRODUCTS.rebuild(
+        ((category, product_name), views)
+        for category, products in stats.get('product_views', {}).items()
+        for product_name, views in products.items()
+    )
 
 def backup_data():
     """Crée une sauvegarde des fichiers de données"""
@@ -146,11 +286,11 @@ def print_catalog_debug():
     """Fonction de debug pour afficher le contenu du catalogue"""
     for category, products in CATALOG.items():
         if category != 'stats':
-            print(f"\nCatégorie: {category}")
+            logger.debug(f"Catégorie: {category}")
             for product in products:
-                print(f"  Produit: {product['name']}")
-                if 'media' in product:
-                    print(f"    Médias ({len(product['media'])}): {product['media']}")
+                logger.debug(f"  Produit: {product.name}")
+                if product.media:
+                    logger.debug(f"    Médias ({len(product.media)}): {product.media}")
 
 # États de conversation
 CHOOSING = "CHOOSING"
@@ -172,8 +312,411 @@ WAITING_ORDER_BUTTON_CONFIG = "WAITING_ORDER_BUTTON_CONFIG"
 WAITING_WELCOME_MESSAGE = "WAITING_WELCOME_MESSAGE"  # Ajout de cette ligne
 
 
-# Charger le catalogue au démarrage
-CATALOG = load_catalog()
+# Le catalogue est chargé au démarrage de l'application, pas à l'import (voir start_catalog_loading)
+CATALOG = {}
+
+async def show_product_media(query, context, media, caption, reply_markup):
+    """
+    Affiche un média de produit dans le message du bouton cliqué.
+    Si ce message contient déjà un média, il est modifié en place (1 appel API),
+    sinon il est supprimé puis renvoyé (2 appels API).
+    """
+    if media.media_type is PHOTO:
+        input_media = InputMediaPhoto(media=media.media_id, caption=caption, parse_mode='HTML')
+    else:
+        input_media = InputMediaVideo(media=media.media_id, caption=caption, parse_mode='HTML')
+
+    if query.message.photo or query.message.video:
+        try:
+            return await query.message.edit_media(
+                media=input_media,
+                reply_markup=reply_markup
+            )
+        except Exception as e:
+            logger.warning(f"Erreur lors de la modification du média, renvoi du message: {e}")
+
+    if media.media_type is PHOTO:
+        message = await context.bot.send_photo(
+            chat_id=query.message.chat_id,
+            photo=media.media_id,
+            caption=caption,
+            reply_markup=reply_markup,
+            parse_mode='HTML'
+        )
+    else:
+        message = await context.bot.send_video(
+            chat_id=query.message.chat_id,
+            video=media.media_id,
+            caption=caption,
+            reply_markup=reply_markup,
+            parse_mode='HTML'
+        )
+    DELETION_QUEUE.schedule(query.message.chat_id, query.message.message_id)
+    return message
+
+# Telegram accepte entre 2 et 10 médias par album
+MAX_ALBUM_SIZE = 10
+
+async def send_product_album(query, context, view):
+    """
+    Envoie tous les médias d'un produit sous forme d'album (un appel API par tranche de 10),
+    suivis d'un message avec la légende et le bouton Commander.
+    Retourne les IDs des messages de l'album et le message de légende.
+    """
+    media_group = [
+        InputMediaPhoto(media=media.media_id) if media.media_type is PHOTO
+        else InputMediaVideo(media=media.media_id)
+        for media in view['media']
+    ]
+    chunks = [media_group[i:i + MAX_ALBUM_SIZE] for i in range(0, len(media_group), MAX_ALBUM_SIZE)]
+    # Un album ne peut pas contenir un seul média : emprunter le dernier de la tranche précédente
+    if len(chunks) > 1 and len(chunks[-1]) == 1:
+        chunks[-1].insert(0, chunks[-2].pop())
+
+    album_message_ids = []
+    for chunk in chunks:
+        messages = await context.bot.send_media_group(chat_id=query.message.chat_id, media=chunk)
+        album_message_ids.extend(message.message_id for message in messages)
+
+    message = await context.bot.send_message(
+        chat_id=query.message.chat_id,
+        text=view['caption'],
+        reply_markup=view['album_reply_markup'],
+        parse_mode='HTML'
+    )
+    DELETION_QUEUE.schedule(query.message.chat_id, query.message.message_id)
+    return album_message_ids, message
+
+# Cache de rendu des fiches produit : (catégorie courte, produit court) -> fiche
+PRODUCT_RENDER_CACHE = {}
+
+def invalidate_render_cache():
+    """Vide le cache des fiches produit, à appeler après toute modification du catalogue ou du bouton Commander"""
+    PRODUCT_RENDER_CACHE.clear()
+
+def find_product(short_category, short_product):
+    """Retrouve la catégorie et le produit à partir des noms tronqués des callbacks"""
+    category = next((cat for cat in CATALOG.keys() if cat.startswith(short_category) or short_category.startswith(cat)), None)
+    if not category:
+        return None, None
+    product = next((p for p in CATALOG[category] if p.name.startswith(short_product) or short_product.startswith(p.name)), None)
+    return category, product
+
+def render_product(short_category, short_product):
+    """
+    Retourne la fiche d'un produit (catégorie, produit, médias triés, légende, un clavier par média).
+    La fiche est construite au premier affichage puis servie depuis le cache.
+    L'index du média cible est encodé dans les boutons Précédent/Suivant : media_<index>_<catégorie>_<produit>
+    """
+    view = PRODUCT_RENDER_CACHE.get((short_category, short_product))
+    if view is not None:
+        return view
+
+    category, product = find_product(short_category, short_product)
+    if not product:
+        return None
+
+    caption = f"📱 <b>{product.name}</b>\n\n"
+    caption += f"💰 <b>Prix:</b>\n{product.price}\n\n"
+    caption += f"📝 <b>Description:</b>\n{product.description}"
+
+    media_list = product.media or ()
+
+    bottom_row = [
+        InlineKeyboardButton("🔙 Retour à la catégorie", callback_data=f"view_{category}"),
+        InlineKeyboardButton(
+            "🛒 Commander",
+            **({"url": CONFIG['order_url']} if CONFIG.get('order_url')
+               else {"callback_data": "show_order_text"})
+        )
+    ]
+
+    total_media = len(media_list)
+    if total_media > 1:
+        reply_markups = [
+            InlineKeyboardMarkup([
+                [
+                    InlineKeyboardButton("⬅️ Précédent", callback_data=f"media_{(index - 1) % total_media}_{short_category}_{short_product}"),
+                    InlineKeyboardButton("➡️ Suivant", callback_data=f"media_{(index + 1) % total_media}_{short_category}_{short_product}")
+                ],
+                bottom_row
+            ])
+            for index in range(total_media)
+        ]
+    else:
+        reply_markups = [InlineKeyboardMarkup([bottom_row])]
+
+    # Mode d'affichage : valeur du produit, sinon valeur globale de config.json
+    view_mode = product.view_mode or CONFIG.get('product_view_mode', 'carousel')
+
+    view = {
+        'category': category,
+        'product': product,
+        'media': media_list,
+        'caption': caption,
+        'reply_markups': reply_markups,
+        'album': view_mode == 'album' and total_media > 1,
+        'album_reply_markup': InlineKeyboardMarkup([bottom_row])
+    }
+    PRODUCT_RENDER_CACHE[(short_category, short_product)] = view
+    return view
+
+# Index de recherche construit au chargement puis mis à jour à chaque modification du catalogue
+SEARCH_INDEX = SearchIndex()
+
+# Historique des vues par heure et par jour
+VIEW_TIMELINE = ViewTimeline()
+
+def apply_catalog(catalog, search_index=None):
+    """
+    Remplace le catalogue (chargé au démarrage ou modifié sur le disque)
+    et reconstruit tout ce qui en dépend. L'index peut être fourni déjà construit.
+    """
+    global CATALOG, VIEW_TIMELINE, SEARCH_INDEX
+    CATALOG = catalog
+    if search_index is None:
+        SEARCH_INDEX.build(CATALOG)
+    else:
+        SEARCH_INDEX = search_index
+    catalog_changed()
+    rebuild_leaderboards()
+    VIEW_TIMELINE = ViewTimeline.from_dict(CATALOG.get('stats', {}).get('timeline'))
+
+def build_search_index(catalog):
+    search_index = SearchIndex()
+    search_index.build(catalog)
+    return search_index
+
+def prepare_catalog():
+    """Lecture du catalogue et construction de l'index, sans toucher à l'état global"""
+    catalog = load_catalog()
+    return catalog, build_search_index(catalog)
+
+def prepare_catalog_file(path):
+    """Pour le FileWatcher : relecture d'un catalogue modifié à la main et de son index, dans son thread"""
+    catalog = read_catalog_file(path)
+    return catalog, build_search_index(catalog)
+
+def release_catalog(garbage):
+    """
+    Libère un ancien catalogue et son index morceau par morceau. Une libération d'un bloc
+    garderait le GIL jusqu'au bout ; ici le thread le rend à la boucle entre deux morceaux.
+    """
+    catalog, search_index = garbage
+    garbage.clear()
+    while catalog:
+        catalog.popitem()
+    for mapping in (search_index.index, search_index.documents):
+        while mapping:
+            mapping.popitem()
+
+def set_aside_catalog_edit():
+    """Copie dans backups/ un catalog_file modifié à la main avant que le bot ne le réécrive"""
+    backup_dir = "backups"
+    os.makedirs(backup_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    backup_path = f"{backup_dir}/catalog_edit_{timestamp}.json"
+    shutil.copy2(CONFIG['catalog_file'], backup_path)
+    return backup_path
+
+def reload_catalog(prepared):
+    """Installe un catalogue préparé par prepare_catalog_file"""
+    if CATALOG_EXPORT_PENDING:
+        # L'export JSON est en retard sur le snapshot : le recharger effacerait les dernières
+        # modifications faites dans le bot. La modification est refusée et mise de côté,
+        # puis l'export est remis à jour.
+        backup_path = set_aside_catalog_edit()
+        logger.warning(
+            f"⚠️ {CONFIG['catalog_file']} modifié alors que son export était en retard sur le bot : "
+            f"modification refusée et copiée dans {backup_path}, à refaire sur le fichier réécrit"
+        )
+        export_catalog()
+        return
+    # L'ancien catalogue n'est plus référencé que par la liste confiée au thread
+    garbage = [CATALOG, SEARCH_INDEX]
+    apply_catalog(*prepared)
+    asyncio.get_running_loop().run_in_executor(None, release_catalog, garbage)
+
+# Chargement du catalogue en cours (lancé au début de main, attendu dans post_init)
+CATALOG_LOADING = None
+
+def start_catalog_loading():
+    """Lance la lecture du catalogue dans un thread, pendant la création et l'initialisation du bot"""
+    global CATALOG_LOADING
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='catalog')
+    CATALOG_LOADING = executor.submit(prepare_catalog)
+    executor.shutdown(wait=False)
+
+async def finish_catalog_loading():
+    """Installe le catalogue chargé en arrière-plan (ou le charge s'il n'a pas été lancé)"""
+    global CATALOG_LOADING
+    if CATALOG_LOADING is None:
+        start_catalog_loading()
+    catalog, search_index = await asyncio.wrap_future(CATALOG_LOADING)
+    CATALOG_LOADING = None
+    apply_catalog(catalog, search_index)
+
+def init_catalog():
+    """Chargement synchrone du catalogue, pour les scripts et benchmarks qui n'utilisent pas main()"""
+    apply_catalog(*prepare_catalog())
+
+def apply_config(config):
+    """Remplace la configuration par celle modifiée sur le disque"""
+    global CONFIG, ADMIN_IDS
+    if config['catalog_file'] != CONFIG['catalog_file']:
+        logger.warning("⚠️ Le changement de catalog_file ne sera pris en compte qu'au redémarrage")
+        config['catalog_file'] = CONFIG['catalog_file']
+    if config.get('catalog_snapshot') != CONFIG.get('catalog_snapshot'):
+        logger.warning("⚠️ Le changement de catalog_snapshot ne sera pris en compte qu'au redémarrage")
+        config.pop('catalog_snapshot', None)
+        if CONFIG.get('catalog_snapshot'):
+            config['catalog_snapshot'] = CONFIG['catalog_snapshot']
+    CONFIG = config
+    ADMIN_IDS = config['admin_ids']
+    set_levels(config.get('log_levels'))
+    metrics.set_enabled(config.get('metrics_enabled', True))
+    invalidate_render_cache()
+
+# Suppressions de messages traitées en arrière-plan, après l'envoi de la réponse
+DELETION_QUEUE = DeletionQueue()
+
+# Durée d'affichage des messages de confirmation de l'administration (en secondes)
+CONFIRMATION_DELAY = 3
+
+# Les user_data inactives depuis une semaine sont évincées (au plus 100 000 sessions en mémoire)
+SESSIONS = SessionTracker(ttl=7 * 24 * 3600, maxsize=100_000)
+SESSION_EVICTION_INTERVAL = 600
+
+# Début du traitement des updates en cours : update_id -> perf_counter()
+DISPATCH_STARTS = {}
+
+async def track_session(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Note l'activité de l'utilisateur avant le traitement de chaque update"""
+    if update.effective_user:
+        SESSIONS.touch(update.effective_user.id)
+    if metrics.ENABLED:
+        if len(DISPATCH_STARTS) > 10_000:
+            DISPATCH_STARTS.clear()
+        DISPATCH_STARTS[update.update_id] = perf_counter()
+
+async def finish_dispatch(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Enregistre la durée totale de traitement de l'update, après tous les handlers"""
+    start = DISPATCH_STARTS.pop(update.update_id, None)
+    if start is not None:
+        kind = 'callback_query' if update.callback_query else 'message' if update.message else 'other'
+        metrics.observe('dispatch', kind, perf_counter() - start)
+
+async def evict_idle_sessions(application):
+    """Supprime périodiquement les user_data des utilisateurs inactifs"""
+    while True:
+        await asyncio.sleep(SESSION_EVICTION_INTERVAL)
+        for user_id in SESSIONS.pop_idle():
+            application.drop_user_data(user_id)
+
+async def export_catalog_periodically():
+    """Tient l'export JSON du catalogue à jour quand les sauvegardes vont dans le snapshot"""
+    while True:
+        await asyncio.sleep(CATALOG_EXPORT_INTERVAL)
+        try:
+            export_catalog()
+        except Exception as e:
+            logger.error(f"Erreur lors de l'export JSON du catalogue: {e}")
+
+async def start_background_tasks(application):
+    """Termine le démarrage et lance les tâches de fond une fois l'application initialisée"""
+    await finish_catalog_loading()
+
+    # Les sessions restaurées par la persistance démarrent avec un délai d'inactivité complet
+    for user_id in application.user_data:
+        SESSIONS.touch(user_id)
+
+    application.create_task(FILE_WATCHER.run())
+    application.create_task(evict_idle_sessions(application))
+    DELETION_QUEUE.start(application)
+    if CONFIG.get('catalog_snapshot'):
+        application.create_task(export_catalog_periodically())
+
+    # Export Prometheus optionnel : "metrics_port": 9100 dans config.json
+    if CONFIG.get('metrics_port'):
+        application.create_task(metrics.serve_prometheus(CONFIG.get('metrics_host', '127.0.0.1'), CONFIG['metrics_port']))
+
+async def stop_background_tasks(application):
+    """À l'arrêt du bot : dernier export JSON du catalogue"""
+    try:
+        # Une modification à la main pas encore vue bloquerait l'export, puis l'emporterait
+        # sur le snapshot au prochain démarrage : elle passe d'abord par reload_catalog
+        await FILE_WATCHER.check()
+        export_catalog()
+    except Exception as e:
+        logger.error(f"Erreur lors de l'export JSON du catalogue: {e}")
+
+# Menus paginés de sélection de catégorie : (préfixe du callback, bouton annuler, état)
+CATEGORY_PICKERS = {
+    'cat': ("view_", None, CHOOSING),
+    'addcat': ("select_category_", "cancel_add_product", SELECTING_CATEGORY),
+    'delcat': ("confirm_delete_category_", "cancel_delete_category", SELECTING_CATEGORY_TO_DELETE),
+    'delpcat': ("delete_product_category_", "cancel_delete_product", SELECTING_CATEGORY_TO_DELETE),
+    'editcat': ("editcat_", "cancel_edit", SELECTING_CATEGORY),
+}
+
+# Menus paginés de sélection de produit : (préfixe du callback, bouton annuler, état)
+PRODUCT_PICKERS = {
+    'prod': ("product_", None, CHOOSING),
+    'delp': ("confirm_delete_product_", "cancel_delete_product", SELECTING_PRODUCT_TO_DELETE),
+    'editp': ("editp_", "cancel_edit", SELECTING_PRODUCT_TO_EDIT),
+}
+
+def build_category_keyboard(menu, offset=0):
+    """Construit une page du clavier de sélection de catégorie"""
+    prefix, cancel_callback, _ = CATEGORY_PICKERS[menu]
+    categories = (category for category in CATALOG if category != 'stats')
+    total = len(CATALOG) - (1 if 'stats' in CATALOG else 0)
+
+    keyboard = paginated_keyboard(
+        categories, total, offset,
+        lambda category: InlineKeyboardButton(category, callback_data=f"{prefix}{category}"),
+        menu
+    )
+
+    if cancel_callback:
+        keyboard.append([InlineKeyboardButton("🔙 Annuler", callback_data=cancel_callback)])
+    else:
+        keyboard.append([InlineKeyboardButton("🔙 Retour à l'accueil", callback_data="back_to_home")])
+    return keyboard
+
+def build_product_keyboard(menu, category, offset=0):
+    """Construit une page du clavier de sélection de produit d'une catégorie"""
+    prefix, cancel_callback, _ = PRODUCT_PICKERS[menu]
+    products = CATALOG.get(category, [])
+
+    keyboard = paginated_keyboard(
+        products, len(products), offset,
+        lambda product: InlineKeyboardButton(
+            product.name,
+            callback_data=f"{prefix}{category[:10]}_{product.name[:20]}"
+        ),
+        menu, category
+    )
+
+    if cancel_callback:
+        keyboard.append([InlineKeyboardButton("🔙 Annuler", callback_data=cancel_callback)])
+    else:
+        keyboard.append([InlineKeyboardButton("🔙 Retour au menu", callback_data="show_categories")])
+    return keyboard
+
+# file_id Telegram de la bannière, retenu après le premier envoi (si banner_image est une URL par exemple)
+BANNER_FILE_IDS = {}
+
+async def send_banner(context, chat_id):
+    """Envoie l'image bannière en réutilisant son file_id dès que possible"""
+    source = CONFIG['banner_image']
+    banner_message = await context.bot.send_photo(
+        chat_id=chat_id,
+        photo=BANNER_FILE_IDS.get(source, source)
+    )
+    if banner_message.photo:
+        BANNER_FILE_IDS[source] = banner_message.photo[-1].file_id
+    return banner_message
 
 # Fonctions de base
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -182,30 +725,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     #enregistrer utilisateur
     await admin_features.register_user(user)
-    # Supprimer le message /start
-    await update.message.delete()
-    
-    # Supprimer les anciens messages si nécessaire
-    if 'menu_message_id' in context.user_data:
-        try:
-            await context.bot.delete_message(
-                chat_id=chat_id,
-                message_id=context.user_data['menu_message_id']
-            )
-        except:
-            pass
-    
-    # Supprimer l'ancienne bannière si elle existe
-    if 'banner_message_id' in context.user_data:
-        try:
-            await context.bot.delete_message(
-                chat_id=chat_id,
-                message_id=context.user_data['banner_message_id']
-            )
-            del context.user_data['banner_message_id']  # Supprimer la référence à l'ancienne bannière
-        except:
-            pass
-    
+
     # Nouveau clavier simplifié pour l'accueil
     keyboard = [
         [InlineKeyboardButton("📋 MENU", callback_data="show_categories")]
@@ -244,13 +764,49 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
             [InlineKeyboardButton("🥔 Canal potato", url="https://doudlj.org/joinchat/5ZEmn25bOsTR7f-aYdvC0Q")]
         ])
 
+    menu_message_id = context.user_data.get('menu_message_id')
+    banner_message_id = context.user_data.get('banner_message_id')
+
+    # /start déjà supprimés par le chemin rapide : leurs IDs restent consommés dans le chat
+    last_start_id = context.user_data.get('last_start_message_id')
+    follows_menu = menu_message_id and (
+        update.message.message_id == menu_message_id + 1
+        or (last_start_id and last_start_id > menu_message_id and update.message.message_id == last_start_id + 1)
+    )
+
+    # Chemin rapide : la bannière et le menu sont encore les derniers messages du chat,
+    # il suffit de remettre le menu sur l'accueil (le /start est supprimé en arrière-plan)
+    if (CONFIG.get('banner_image') and banner_message_id and menu_message_id == banner_message_id + 1
+            and follows_menu):
+        try:
+            await context.bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=menu_message_id,
+                text=welcome_text,
+                reply_markup=InlineKeyboardMarkup(keyboard),
+                parse_mode='HTML'
+            )
+            DELETION_QUEUE.schedule(chat_id, update.message.message_id)
+            context.user_data['last_start_message_id'] = update.message.message_id
+            return CHOOSING
+        except Exception as e:
+            if 'not modified' in str(e):
+                DELETION_QUEUE.schedule(chat_id, update.message.message_id)
+                context.user_data['last_start_message_id'] = update.message.message_id
+                return CHOOSING
+            logger.warning(f"Erreur lors de la réutilisation du menu: {e}")
+    
+    # Le message /start et les anciens messages seront supprimés après l'envoi des nouveaux
+    context.user_data.pop('last_start_message_id', None)
+    old_message_ids = [update.message.message_id]
+    for message_key in ('menu_message_id', 'banner_message_id'):
+        if message_key in context.user_data:
+            old_message_ids.append(context.user_data.pop(message_key))
+
     try:
         # Vérifier si une image banner est configurée
         if CONFIG.get('banner_image'):
-            banner_message = await context.bot.send_photo(
-                chat_id=chat_id,
-                photo=CONFIG['banner_image']
-            )
+            banner_message = await send_banner(context, chat_id)
             context.user_data['banner_message_id'] = banner_message.message_id
 
         # Envoyer le menu d'accueil
@@ -263,7 +819,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data['menu_message_id'] = menu_message.message_id
         
     except Exception as e:
-        print(f"Erreur lors du démarrage: {e}")
+        logger.error(f"Erreur lors du démarrage: {e}")
         # En cas d'erreur, envoyer au moins le menu
         menu_message = await context.bot.send_message(
             chat_id=chat_id,
@@ -272,46 +828,66 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode='HTML'
         )
         context.user_data['menu_message_id'] = menu_message.message_id
-    
+
+    DELETION_QUEUE.schedule_many(chat_id, old_message_ids)
     return CHOOSING
 
 async def admin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Commande pour accéder au menu d'administration"""
     if str(update.effective_user.id) in ADMIN_IDS:
-        # Supprimer le message /admin
-        await update.message.delete()
-        
-        # Supprimer les anciens messages si leurs IDs sont stockés
-        messages_to_delete = ['menu_message_id', 'banner_message_id', 'category_message_id', 
-                            'last_product_message_id', 'instruction_message_id']
-        
-        for message_key in messages_to_delete:
+        chat_id = update.effective_chat.id
+
+        # Le message /admin et les anciens messages seront supprimés après l'envoi du menu
+        old_message_ids = [update.message.message_id]
+        for message_key in ['menu_message_id', 'banner_message_id', 'category_message_id',
+                            'last_product_message_id', 'instruction_message_id']:
             if message_key in context.user_data:
-                try:
-                    await context.bot.delete_message(
-                        chat_id=update.effective_chat.id,
-                        message_id=context.user_data[message_key]
-                    )
-                    del context.user_data[message_key]
-                except Exception as e:
-                    print(f"Erreur lors de la suppression du message {message_key}: {e}")
+                old_message_ids.append(context.user_data.pop(message_key))
         
         # Envoyer la bannière d'abord si elle existe
         if CONFIG.get('banner_image'):
             try:
-                banner_message = await context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=CONFIG['banner_image']
-                )
+                banner_message = await send_banner(context, chat_id)
                 context.user_data['banner_message_id'] = banner_message.message_id
             except Exception as e:
-                print(f"Erreur lors de l'envoi de la bannière: {e}")
-        
-        return await show_admin_menu(update, context)
+                logger.error(f"Erreur lors de l'envoi de la bannière: {e}")
+
+        state = await show_admin_menu(update, context)
+        DELETION_QUEUE.schedule_many(chat_id, old_message_ids)
+        return state
     else:
         await update.message.reply_text("❌ Vous n'êtes pas autorisé à accéder au menu d'administration.")
         return ConversationHandler.END
 
+async def search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Commande /search : recherche un produit par nom ou description"""
+    query_text = " ".join(context.args) if context.args else ""
+    if not query_text:
+        await update.message.reply_text(
+            "🔎 Usage: /search [mots clés]\n"
+            "Exemple: /search fraise"
+        )
+        return CHOOSING
+
+    results = SEARCH_INDEX.search(query_text)
+
+    keyboard = [
+        [InlineKeyboardButton(
+            f"{product_name} ({category})",
+            callback_data=f"product_{category[:10]}_{product_name[:20]}"
+        )]
+        for category, product_name in results
+    ]
+    keyboard.append([InlineKeyboardButton("📋 MENU", callback_data="show_categories")])
+
+    if results:
+        text = f"🔎 Résultats pour « {query_text} » :"
+    else:
+        text = f"❌ Aucun produit ne correspond à « {query_text} »."
+
+    await update.message.reply_text(text, reply_markup=InlineKeyboardMarkup(keyboard))
+    return CHOOSING
+
 async def show_admin_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Affiche le menu d'administration"""
     keyboard = [
@@ -321,6 +897,7 @@ async def show_admin_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton("❌ Supprimer un produit", callback_data="delete_product")],
         [InlineKeyboardButton("✏️ Modifier un produit", callback_data="edit_product")],
         [InlineKeyboardButton("📊 Statistiques", callback_data="show_stats")],
+        [InlineKeyboardButton("⏱️ Performances", callback_data="show_metrics")],
         [InlineKeyboardButton("📞 Modifier le contact", callback_data="edit_contact")],
         [InlineKeyboardButton("🛒 Modifier bouton Commander", callback_data="edit_order_button")],
         [InlineKeyboardButton("🏠 Modifier message d'accueil", callback_data="edit_welcome")],  
@@ -351,7 +928,7 @@ async def show_admin_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             context.user_data['menu_message_id'] = message.message_id
     except Exception as e:
-        print(f"Erreur dans show_admin_menu: {e}")
+        logger.error(f"Erreur dans show_admin_menu: {e}")
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
             text=admin_text,
@@ -368,7 +945,7 @@ async def handle_order_button_config(update: Update, context: ContextTypes.DEFAU
     
         try:
             # Supprimer le message de l'utilisateur
-            await update.message.delete()
+            DELETION_QUEUE.schedule(update.effective_chat.id, update.message.message_id)
         
             # Mettre à jour la config selon le format
             if new_config.startswith(('http://', 'https://')):
@@ -391,18 +968,12 @@ async def handle_order_button_config(update: Update, context: ContextTypes.DEFAU
                 button_type = "texte"
             
             # Sauvegarder dans config.json
-            with open('config/config.json', 'w', encoding='utf-8') as f:
-                json.dump(CONFIG, f, indent=4)
+            save_config()
+            invalidate_render_cache()
         
             # Supprimer l'ancien message si possible
             if 'edit_order_button_message_id' in context.user_data:
-                try:
-                    await context.bot.delete_message(
-                        chat_id=update.effective_chat.id,
-                        message_id=context.user_data['edit_order_button_message_id']
-                    )
-                except:
-                    pass
+                DELETION_QUEUE.schedule(update.effective_chat.id, context.user_data['edit_order_button_message_id'])
         
             # Message de confirmation avec le @ ajouté si c'est un pseudo Telegram sans @
             display_value = new_config
@@ -417,17 +988,13 @@ async def handle_order_button_config(update: Update, context: ContextTypes.DEFAU
                 parse_mode='HTML'
             )
         
-            # Attendre 3 secondes puis supprimer le message de confirmation
-            await asyncio.sleep(3)
-            try:
-                await success_message.delete()
-            except:
-                pass
+            # Supprimer le message de confirmation dans 3 secondes, sans bloquer le menu
+            DELETION_QUEUE.schedule_later(CONFIRMATION_DELAY, success_message.chat_id, success_message.message_id)
         
             return await show_admin_menu(update, context)
         
         except Exception as e:
-            print(f"Erreur dans handle_order_button_config: {e}")
+            logger.error(f"Erreur dans handle_order_button_config: {e}")
             return WAITING_ORDER_BUTTON_CONFIG
 
 async def handle_banner_image(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -438,22 +1005,15 @@ async def handle_banner_image(update: Update, context: ContextTypes.DEFAULT_TYPE
 
     # Supprimer le message précédent
     if 'banner_msg' in context.user_data:
-        await context.bot.delete_message(
-            chat_id=context.user_data['banner_msg'].chat_id,
-            message_id=context.user_data['banner_msg'].message_id
-        )
-        del context.user_data['banner_msg']
+        banner_msg = context.user_data.pop('banner_msg')
+        DELETION_QUEUE.schedule(banner_msg.chat_id, banner_msg.message_id)
 
     # Obtenir l'ID du fichier de la photo
     file_id = update.message.photo[-1].file_id
     CONFIG['banner_image'] = file_id
 
     # Sauvegarder la configuration
-    with open('config/config.json', 'w', encoding='utf-8') as f:
-        json.dump(CONFIG, f, indent=4)
-
-    # Supprimer le message contenant l'image
-    await update.message.delete()
+    save_config()
 
     thread_id = update.message.message_thread_id if update.message.is_topic_message else None
 
@@ -463,9 +1023,11 @@ async def handle_banner_image(update: Update, context: ContextTypes.DEFAULT_TYPE
         message_thread_id=thread_id
     )
 
-    # Attendre 3 secondes et supprimer le message
-    await asyncio.sleep(3)
-    await success_msg.delete()
+    # Supprimer le message contenant l'image
+    DELETION_QUEUE.schedule(update.effective_chat.id, update.message.message_id)
+
+    # Supprimer le message dans 3 secondes, sans bloquer le menu
+    DELETION_QUEUE.schedule_later(CONFIRMATION_DELAY, success_msg.chat_id, success_msg.message_id)
 
     return await show_admin_menu(update, context)
 
@@ -515,24 +1077,24 @@ async def handle_category_name(update: Update, context: ContextTypes.DEFAULT_TYP
     
     CATALOG[category_name] = []
     save_catalog(CATALOG)
+    catalog_changed()
     
-    # Supprimer le message précédent
-    await context.bot.delete_message(
-        chat_id=update.effective_chat.id,
-        message_id=update.message.message_id - 1
+    state = await show_admin_menu(update, context)
+
+    # Supprimer le message précédent et le message de l'utilisateur
+    DELETION_QUEUE.schedule_many(
+        update.effective_chat.id,
+        (update.message.message_id - 1, update.message.message_id)
     )
-    
-    # Supprimer le message de l'utilisateur
-    await update.message.delete()
-    
-    return await show_admin_menu(update, context)
+
+    return state
 
 async def handle_product_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Gère l'entrée du nom du produit"""
     product_name = update.message.text
     category = context.user_data.get('temp_product_category')
     
-    if category and any(p.get('name') == product_name for p in CATALOG.get(category, [])):
+    if category and any(p.name == product_name for p in CATALOG.get(category, [])):
         await update.message.reply_text(
             "❌ Ce produit existe déjà dans cette catégorie. Veuillez choisir un autre nom:",
             reply_markup=InlineKeyboardMarkup([[
@@ -543,12 +1105,6 @@ async def handle_product_name(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     context.user_data['temp_product_name'] = product_name
     
-    # Supprimer le message précédent
-    await context.bot.delete_message(
-        chat_id=update.effective_chat.id,
-        message_id=update.message.message_id - 1
-    )
-    
     await update.message.reply_text(
         "💰 Veuillez entrer le prix du produit:",
         reply_markup=InlineKeyboardMarkup([[
@@ -556,8 +1112,11 @@ async def handle_product_name(update: Update, context: ContextTypes.DEFAULT_TYPE
         ]])
     )
     
-    # Supprimer le message de l'utilisateur
-    await update.message.delete()
+    # Supprimer le message précédent et le message de l'utilisateur
+    DELETION_QUEUE.schedule_many(
+        update.effective_chat.id,
+        (update.message.message_id - 1, update.message.message_id)
+    )
     
     return WAITING_PRODUCT_PRICE
 
@@ -567,12 +1126,6 @@ async def handle_product_price(update: Update, context: ContextTypes.DEFAULT_TYP
     price = update.message.text_html if hasattr(update.message, 'text_html') else update.message.text
     context.user_data['temp_product_price'] = price
     
-    # Supprimer le message précédent
-    await context.bot.delete_message(
-        chat_id=update.effective_chat.id,
-        message_id=update.message.message_id - 1
-    )
-    
     await update.message.reply_text(
         "📝 Veuillez entrer la description du produit:",
         reply_markup=InlineKeyboardMarkup([[
@@ -580,8 +1133,11 @@ async def handle_product_price(update: Update, context: ContextTypes.DEFAULT_TYP
         ]])
     )
     
-    # Supprimer le message de l'utilisateur
-    await update.message.delete()
+    # Supprimer le message précédent et le message de l'utilisateur
+    DELETION_QUEUE.schedule_many(
+        update.effective_chat.id,
+        (update.message.message_id - 1, update.message.message_id)
+    )
     
     return WAITING_PRODUCT_DESCRIPTION
 
@@ -594,12 +1150,6 @@ async def handle_product_description(update: Update, context: ContextTypes.DEFAU
     # Initialiser la liste des médias
     context.user_data['temp_product_media'] = []
     
-    # Supprimer le message précédent
-    await context.bot.delete_message(
-        chat_id=update.effective_chat.id,
-        message_id=update.message.message_id - 1
-    )
-    
     # Envoyer et sauvegarder l'ID du message d'invitation
     invitation_message = await update.message.reply_text(
         "📸 Envoyez les photos ou vidéos du produit (plusieurs possibles)\n"
@@ -611,8 +1161,11 @@ async def handle_product_description(update: Update, context: ContextTypes.DEFAU
     )
     context.user_data['media_invitation_message_id'] = invitation_message.message_id
     
-    # Supprimer le message de l'utilisateur
-    await update.message.delete()
+    # Supprimer le message précédent et le message de l'utilisateur
+    DELETION_QUEUE.schedule_many(
+        update.effective_chat.id,
+        (update.message.message_id - 1, update.message.message_id)
+    )
     
     return WAITING_PRODUCT_MEDIA
 
@@ -628,24 +1181,12 @@ async def handle_product_media(update: Update, context: ContextTypes.DEFAULT_TYP
     if 'media_count' not in context.user_data:
         context.user_data['media_count'] = 0
 
+    # Messages à supprimer une fois la nouvelle confirmation envoyée
+    old_message_ids = [update.message.message_id]
     if context.user_data.get('media_invitation_message_id'):
-        try:
-            await context.bot.delete_message(
-                chat_id=update.effective_chat.id,
-                message_id=context.user_data['media_invitation_message_id']
-            )
-            del context.user_data['media_invitation_message_id']
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message d'invitation: {e}")
-
+        old_message_ids.append(context.user_data.pop('media_invitation_message_id'))
     if context.user_data.get('last_confirmation_message_id'):
-        try:
-            await context.bot.delete_message(
-                chat_id=update.effective_chat.id,
-                message_id=context.user_data['last_confirmation_message_id']
-            )
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message de confirmation: {e}")
+        old_message_ids.append(context.user_data['last_confirmation_message_id'])
 
     context.user_data['media_count'] += 1
 
@@ -664,8 +1205,6 @@ async def handle_product_media(update: Update, context: ContextTypes.DEFAULT_TYP
 
     context.user_data['temp_product_media'].append(new_media)
 
-    await update.message.delete()
-
     message = await update.message.reply_text(
         f"Photo/Vidéo {context.user_data['media_count']} ajoutée ! Cliquez sur Terminé pour valider :",
         reply_markup=InlineKeyboardMarkup([
@@ -674,6 +1213,7 @@ async def handle_product_media(update: Update, context: ContextTypes.DEFAULT_TYP
         ])
     )
     context.user_data['last_confirmation_message_id'] = message.message_id
+    DELETION_QUEUE.schedule_many(update.effective_chat.id, old_message_ids)
 
     return WAITING_PRODUCT_MEDIA
 
@@ -685,17 +1225,19 @@ async def finish_product_media(update: Update, context: ContextTypes.DEFAULT_TYP
     if not category:
         return await show_admin_menu(update, context)
 
-    new_product = {
-        'name': context.user_data.get('temp_product_name'),
-        'price': context.user_data.get('temp_product_price'),
-        'description': context.user_data.get('temp_product_description'),
-        'media': context.user_data.get('temp_product_media', [])
-    }
+    new_product = Product(
+        name=context.user_data.get('temp_product_name'),
+        price=context.user_data.get('temp_product_price'),
+        description=context.user_data.get('temp_product_description'),
+        media=[Media.from_dict(media) for media in context.user_data.get('temp_product_media', [])]
+    )
 
     if category not in CATALOG:
         CATALOG[category] = []
     CATALOG[category].append(new_product)
     save_catalog(CATALOG)
+    SEARCH_INDEX.add_product(category, new_product)
+    catalog_changed()
 
     # Au lieu d'essayer de modifier ou supprimer des messages, créons simplement un nouveau menu admin
     context.user_data.clear()
@@ -714,11 +1256,6 @@ async def finish_product_media(update: Update, context: ContextTypes.DEFAULT_TYP
 
     keyboard = await admin_features.add_user_buttons(keyboard)
 
-    try:
-        await query.message.delete()
-    except:
-        pass
-
     message = await context.bot.send_message(
         chat_id=query.message.chat_id,
         text="🔧 *Menu d'administration*\n\n"
@@ -727,6 +1264,7 @@ async def finish_product_media(update: Update, context: ContextTypes.DEFAULT_TYP
         reply_markup=InlineKeyboardMarkup(keyboard),
         parse_mode='Markdown'
     )
+    DELETION_QUEUE.schedule(query.message.chat_id, query.message.message_id)
     
     context.user_data['menu_message_id'] = message.message_id
     return CHOOSING
@@ -745,16 +1283,14 @@ async def handle_new_value(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return await show_admin_menu(update, context)
 
     for product in CATALOG.get(category, []):
-        if product['name'] == product_name:
+        if product.name == product_name:
             old_value = product.get(field, "Non défini")
             product[field] = new_value
             save_catalog(CATALOG)
-
-            await context.bot.delete_message(
-                chat_id=update.effective_chat.id,
-                message_id=update.message.message_id - 1
-            )
-            await update.message.delete()
+            if field == 'name':
+                SEARCH_INDEX.remove_product(category, old_value)
+            SEARCH_INDEX.add_product(category, product)
+            catalog_changed()
 
             keyboard = [[InlineKeyboardButton("🔙 Retour au menu", callback_data="admin")]]
             await context.bot.send_message(
@@ -765,6 +1301,10 @@ async def handle_new_value(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=InlineKeyboardMarkup(keyboard),
                 parse_mode='HTML'  # Ajout du parse_mode HTML
             )
+            DELETION_QUEUE.schedule_many(
+                update.effective_chat.id,
+                (update.message.message_id - 1, update.message.message_id)
+            )
             break
 
     return CHOOSING
@@ -775,7 +1315,7 @@ async def handle_contact_username(update: Update, context: ContextTypes.DEFAULT_
     
     try:
         # Supprimer le message de l'utilisateur
-        await update.message.delete()
+        DELETION_QUEUE.schedule(update.effective_chat.id, update.message.message_id)
         
         if new_value.startswith(('http://', 'https://')):
             # C'est une URL
@@ -806,18 +1346,11 @@ async def handle_contact_username(update: Update, context: ContextTypes.DEFAULT_
             config_type = "Pseudo Telegram"
         
         # Sauvegarder dans config.json
-        with open('config/config.json', 'w', encoding='utf-8') as f:
-            json.dump(CONFIG, f, indent=4)
+        save_config()
         
         # Supprimer l'ancien message de configuration
         if 'edit_contact_message_id' in context.user_data:
-            try:
-                await context.bot.delete_message(
-                    chat_id=update.effective_chat.id,
-                    message_id=context.user_data['edit_contact_message_id']
-                )
-            except:
-                pass
+            DELETION_QUEUE.schedule(update.effective_chat.id, context.user_data['edit_contact_message_id'])
         
         # Message de confirmation avec le @ ajouté si c'est un pseudo Telegram sans @
         display_value = new_value
@@ -832,17 +1365,13 @@ async def handle_contact_username(update: Update, context: ContextTypes.DEFAULT_
             parse_mode='HTML'
         )
         
-        # Attendre 3 secondes puis supprimer le message de confirmation
-        await asyncio.sleep(3)
-        try:
-            await success_message.delete()
-        except:
-            pass
+        # Supprimer le message de confirmation dans 3 secondes, sans bloquer le menu
+        DELETION_QUEUE.schedule_later(CONFIRMATION_DELAY, success_message.chat_id, success_message.message_id)
         
         return await show_admin_menu(update, context)
         
     except Exception as e:
-        print(f"Erreur dans handle_contact_username: {e}")
+        logger.error(f"Erreur dans handle_contact_username: {e}")
         return WAITING_CONTACT_USERNAME
 
 async def handle_welcome_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -852,24 +1381,17 @@ async def handle_welcome_message(update: Update, context: ContextTypes.DEFAULT_T
     
     try:
         # Supprimer le message de l'utilisateur
-        await update.message.delete()
+        DELETION_QUEUE.schedule(update.effective_chat.id, update.message.message_id)
         
         # Mettre à jour la config
         CONFIG['welcome_message'] = new_message
         
         # Sauvegarder dans config.json
-        with open('config/config.json', 'w', encoding='utf-8') as f:
-            json.dump(CONFIG, f, indent=4)
+        save_config()
         
         # Supprimer l'ancien message si possible
         if 'edit_welcome_message_id' in context.user_data:
-            try:
-                await context.bot.delete_message(
-                    chat_id=update.effective_chat.id,
-                    message_id=context.user_data['edit_welcome_message_id']
-                )
-            except:
-                pass
+            DELETION_QUEUE.schedule(update.effective_chat.id, context.user_data['edit_welcome_message_id'])
         
         # Message de confirmation
         success_message = await context.bot.send_message(
@@ -879,19 +1401,126 @@ async def handle_welcome_message(update: Update, context: ContextTypes.DEFAULT_T
             parse_mode='HTML'
         )
         
-        # Attendre 3 secondes puis supprimer le message de confirmation
-        await asyncio.sleep(3)
-        try:
-            await success_message.delete()
-        except:
-            pass
+        # Supprimer le message de confirmation dans 3 secondes, sans bloquer le menu
+        DELETION_QUEUE.schedule_later(CONFIRMATION_DELAY, success_message.chat_id, success_message.message_id)
         
         return await show_admin_menu(update, context)
         
     except Exception as e:
-        print(f"Erreur dans handle_welcome_message: {e}")
+        logger.error(f"Erreur dans handle_welcome_message: {e}")
         return WAITING_WELCOME_MESSAGE
 
+def build_stats_text():
+    """Texte de l'écran des statistiques (les stats sont nettoyées si le catalogue a changé)"""
+    utc_now = datetime.utcnow()
+    paris_now = utc_now.replace(tzinfo=pytz.UTC).astimezone(paris_tz)
+
+    # Initialisation des stats si nécessaire
+    stats = ensure_stats()
+
+    # Nettoyer les stats avant l'affichage (seulement si le catalogue a changé)
+    clean_stats()
+
+    text = "📊 *Statistiques du catalogue*\n\n"
+    text += f"👥 Vues totales: {stats.get('total_views', 0)}\n"
+
+    # Conversion de l'heure en fuseau horaire Paris
+    last_updated = stats.get('last_updated', 'Jamais')
+    if last_updated != 'Jamais':
+        try:
+            if len(last_updated) > 8:  # Si format complet
+                dt = datetime.strptime(last_updated, "%Y-%m-%d %H:%M:%S")
+            else:  # Si format HH:MM:SS
+                today = paris_now.strftime("%Y-%m-%d")
+                dt = datetime.strptime(f"{today} {last_updated}", "%Y-%m-%d %H:%M:%S")
+        
+            # Convertir en timezone Paris
+            dt = dt.replace(tzinfo=pytz.UTC).astimezone(paris_tz)
+            last_updated = dt.strftime("%H:%M:%S")
+        except Exception as e:
+            logger.error(f"Erreur conversion heure: {e}")
+        
+    text += f"🕒 Dernière mise à jour: {last_updated}\n"
+
+    if 'last_reset' in stats:
+        text += f"🔄 Dernière réinitialisation: {stats.get('last_reset', 'Jamais')}\n"
+    text += "\n"
+
+    text += "📉 *Tendances:*\n"
+    text += f"- Dernières 24h: {VIEW_TIMELINE.last_hours(24)} vues\n"
+    text += f"- 7 derniers jours: {VIEW_TIMELINE.last_days(7)} vues\n"
+    text += f"- 30 derniers jours: {VIEW_TIMELINE.last_days(30)} vues\n\n"
+
+    # Le reste du code reste identique
+    text += "📈 *Vues par catégorie:*\n"
+    top_categories = TOP_CATEGORIES.items()
+    if top_categories:
+        for category, views in top_categories:
+            text += f"- {category}: {views} vues\n"
+        # Le message doit tenir dans la limite de Telegram, quel que soit le nombre de catégories
+        others = len(stats['category_views']) - len(top_categories)
+        if others > 0:
+            text += f"- +{others} autres catégories\n"
+    else:
+        text += "Aucune vue enregistrée.\n"
+
+    text += "\n━━━━━━━━━━━━━━━\n\n"
+
+    text += "🔥 *Produits les plus populaires:*\n"
+    top_products = TOP_PRODUCTS.items()
+    if top_products:
+        for (category, product_name), views in top_products:
+            text += f"- {product_name} ({category}): {views} vues\n"
+    else:
+        text += "Aucune vue enregistrée sur les produits.\n"
+    return text
+
+# Préfixes des callbacks portant un nom de catégorie ou de produit : une seule route par préfixe
+ROUTE_PREFIXES = (
+    "pg_", "select_category_", "delete_product_category_", "confirm_delete_category_",
+    "really_delete_category_", "confirm_delete_product_", "really_delete_product_",
+    "product_", "view_", "media_", "next_media_", "prev_media_", "editcat_", "editp_",
+)
+
+def callback_route(data):
+    """Nom de route d'un callback, pour les mesures"""
+    for prefix in ROUTE_PREFIXES:
+        if data.startswith(prefix):
+            return prefix[:-1]
+    return data
+
+def timed_by_route(handler):
+    """Mesure la durée d'un handler de boutons pour chaque route de callback"""
+    @functools.wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if not metrics.ENABLED or not update.callback_query:
+            return await handler(update, context)
+        start = perf_counter()
+        try:
+            return await handler(update, context)
+        finally:
+            metrics.observe('route', callback_route(update.callback_query.data or ''), perf_counter() - start)
+    return wrapper
+
+def format_metrics():
+    """Texte de l'écran des performances : les mesures les plus coûteuses en temps total"""
+    text = "⏱️ *Performances*\n\n"
+    if not metrics.ENABLED:
+        return text + "Les mesures sont désactivées (metrics\\_enabled)."
+    histograms = metrics.summary()
+    if not histograms:
+        return text + "Aucune mesure enregistrée."
+    for histogram in histograms[:25]:
+        name = f"{histogram.name}/{histogram.label}" if histogram.label else histogram.name
+        text += (
+            f"`{name}` — {histogram.count} appels\n"
+            f"   moy {histogram.sum / histogram.count * 1000:.1f} ms · "
+            f"p50 ≤ {histogram.percentile(50) * 1000:g} ms · "
+            f"p99 ≤ {histogram.percentile(99) * 1000:g} ms\n"
+        )
+    return text
+
+@timed_by_route
 async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Gestion des boutons normaux"""
     global paris_tz 
@@ -914,7 +1543,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
                     InlineKeyboardButton("🔙 Annuler", callback_data="cancel_edit")
                 ]])
             )
-            context.user_data['banner_msg'] = msg
+            context.user_data['banner_msg'] = MessageRef(msg.chat_id, msg.message_id)
             return WAITING_BANNER_IMAGE
 
     elif query.data == "manage_users":
@@ -932,13 +1561,33 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
         )
         return WAITING_CATEGORY_NAME
 
+    elif query.data.startswith("pg_"):
+        # Navigation entre les pages d'un menu : seul le clavier est modifié
+        menu, offset, category = parse_page_callback(query.data)
+        if menu in CATEGORY_PICKERS:
+            keyboard = build_category_keyboard(menu, offset)
+            state = CATEGORY_PICKERS[menu][2]
+        elif menu in PRODUCT_PICKERS and category in CATALOG:
+            keyboard = build_product_keyboard(menu, category, offset)
+            state = PRODUCT_PICKERS[menu][2]
+        else:
+            return None
+
+        try:
+            await query.message.edit_reply_markup(reply_markup=InlineKeyboardMarkup(keyboard))
+        except Exception as e:
+            logger.error(f"Erreur lors du changement de page: {e}")
+
+        if menu == 'prod':
+            context.user_data['category_view'] = CategoryView(category, offset)
+        return state
+
+    elif query.data == "noop":
+        return None
+
     elif query.data == "add_product":
-        keyboard = []
-        for category in CATALOG.keys():
-            if category != 'stats':
-                keyboard.append([InlineKeyboardButton(category, callback_data=f"select_category_{category}")])
-        keyboard.append([InlineKeyboardButton("🔙 Annuler", callback_data="cancel_add_product")])
-        
+        keyboard = build_category_keyboard('addcat')
+
         await query.message.edit_text(
             "📝 Sélectionnez la catégorie pour le nouveau produit:",
             reply_markup=InlineKeyboardMarkup(keyboard)
@@ -961,19 +1610,8 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
 
     elif query.data.startswith("delete_product_category_"):
         category = query.data.replace("delete_product_category_", "")
-        products = CATALOG.get(category, [])
-    
-        keyboard = []
-        for product in products:
-            if isinstance(product, dict):
-                keyboard.append([
-                    InlineKeyboardButton(
-                        product['name'],
-                        callback_data=f"confirm_delete_product_{category[:10]}_{product['name'][:20]}"
-                    )
-                ])
-        keyboard.append([InlineKeyboardButton("🔙 Annuler", callback_data="cancel_delete_product")])
-    
+        keyboard = build_product_keyboard('delp', category)
+
         await query.message.edit_text(
             f"⚠️ Sélectionnez le produit à supprimer de *{category}* :",
             reply_markup=InlineKeyboardMarkup(keyboard),
@@ -982,11 +1620,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
         return SELECTING_PRODUCT_TO_DELETE
 
     elif query.data == "delete_category":
-        keyboard = []
-        for category in CATALOG.keys():
-            if category != 'stats':
-                keyboard.append([InlineKeyboardButton(category, callback_data=f"confirm_delete_category_{category}")])
-        keyboard.append([InlineKeyboardButton("🔙 Annuler", callback_data="cancel_delete_category")])
+        keyboard = build_category_keyboard('delcat')
         
         await query.message.edit_text(
             "⚠️ Sélectionnez la catégorie à supprimer:",
@@ -1018,6 +1652,8 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
         if category in CATALOG:
             del CATALOG[category]
             save_catalog(CATALOG)
+            SEARCH_INDEX.remove_category(category)
+            catalog_changed()
             await query.message.edit_text(
                 f"✅ La catégorie *{category}* a été supprimée avec succès !",
                 parse_mode='Markdown',
@@ -1028,16 +1664,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
         return CHOOSING
 
     elif query.data == "delete_product":
-        keyboard = []
-        for category in CATALOG.keys():
-            if category != 'stats':
-                keyboard.append([
-                    InlineKeyboardButton(
-                        category, 
-                        callback_data=f"delete_product_category_{category}"
-                    )
-                ])
-        keyboard.append([InlineKeyboardButton("🔙 Annuler", callback_data="cancel_delete_product")])
+        keyboard = build_category_keyboard('delpcat')
         
         await query.message.edit_text(
             "⚠️ Sélectionnez la catégorie du produit à supprimer:",
@@ -1055,7 +1682,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
                 # Trouver la vraie catégorie et le vrai produit
                 category = next((cat for cat in CATALOG.keys() if cat.startswith(short_category) or short_category.startswith(cat)), None)
                 if category:
-                    product_name = next((p['name'] for p in CATALOG[category] if p['name'].startswith(short_product) or short_product.startswith(p['name'])), None)
+                    product_name = next((p.name for p in CATALOG[category] if p.name.startswith(short_product) or short_product.startswith(p.name)), None)
                     if product_name:
                         # Créer le clavier de confirmation avec les noms courts
                         keyboard = [
@@ -1076,7 +1703,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
                         return SELECTING_PRODUCT_TO_DELETE
 
             except Exception as e:
-                print(f"Erreur lors de la confirmation de suppression: {e}")
+                logger.error(f"Erreur lors de la confirmation de suppression: {e}")
                 return await show_admin_menu(update, context)
 
     elif query.data.startswith("really_delete_product_"):
@@ -1088,10 +1715,12 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
             # Trouver la vraie catégorie et le vrai produit
             category = next((cat for cat in CATALOG.keys() if cat.startswith(short_category) or short_category.startswith(cat)), None)
             if category:
-                product_name = next((p['name'] for p in CATALOG[category] if p['name'].startswith(short_product) or short_product.startswith(p['name'])), None)
+                product_name = next((p.name for p in CATALOG[category] if p.name.startswith(short_product) or short_product.startswith(p.name)), None)
                 if product_name:
-                    CATALOG[category] = [p for p in CATALOG[category] if p['name'] != product_name]
+                    CATALOG[category] = [p for p in CATALOG[category] if p.name != product_name]
                     save_catalog(CATALOG)
+                    SEARCH_INDEX.remove_product(category, product_name)
+                    catalog_changed()
                     await query.message.edit_text(
                         f"✅ Le produit *{product_name}* a été supprimé avec succès !",
                         parse_mode='Markdown',
@@ -1102,7 +1731,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
             return CHOOSING
 
         except Exception as e:
-            print(f"Erreur lors de la suppression du produit: {e}")
+            logger.error(f"Erreur lors de la suppression du produit: {e}")
             return await show_admin_menu(update, context)
 
     elif query.data == "edit_order_button":
@@ -1162,7 +1791,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
             return CHOOSING
         
         except Exception as e:
-            print(f"Erreur lors de l'affichage du message: {e}")
+            logger.error(f"Erreur lors de l'affichage du message: {e}")
             await query.answer("Une erreur est survenue lors de l'affichage du message", show_alert=True)
             return CHOOSING
 
@@ -1187,90 +1816,40 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
             return WAITING_WELCOME_MESSAGE
 
     elif query.data == "show_stats":
-        # Configuration du fuseau horaire Paris
-        paris_tz = pytz.timezone('Europe/Paris')
-        utc_now = datetime.utcnow()
-        paris_now = utc_now.replace(tzinfo=pytz.UTC).astimezone(paris_tz)
-
-        # Initialisation des stats si nécessaire
-        if 'stats' not in CATALOG:
-            CATALOG['stats'] = {
-                "total_views": 0,
-                "category_views": {},
-                "product_views": {},
-                "last_updated": paris_now.strftime("%H:%M:%S"),
-                "last_reset": paris_now.strftime("%Y-%m-%d")
-            }
-    
-        # Nettoyer les stats avant l'affichage
-        clean_stats()
-    
-        stats = CATALOG['stats']
-        text = "📊 *Statistiques du catalogue*\n\n"
-        text += f"👥 Vues totales: {stats.get('total_views', 0)}\n"
-    
-        # Conversion de l'heure en fuseau horaire Paris
-        last_updated = stats.get('last_updated', 'Jamais')
-        if last_updated != 'Jamais':
-            try:
-                if len(last_updated) > 8:  # Si format complet
-                    dt = datetime.strptime(last_updated, "%Y-%m-%d %H:%M:%S")
-                else:  # Si format HH:MM:SS
-                    today = paris_now.strftime("%Y-%m-%d")
-                    dt = datetime.strptime(f"{today} {last_updated}", "%Y-%m-%d %H:%M:%S")
-            
-                # Convertir en timezone Paris
-                dt = dt.replace(tzinfo=pytz.UTC).astimezone(paris_tz)
-                last_updated = dt.strftime("%H:%M:%S")
-            except Exception as e:
-                print(f"Erreur conversion heure: {e}")
-            
-        text += f"🕒 Dernière mise à jour: {last_updated}\n"
-    
-        if 'last_reset' in stats:
-            text += f"🔄 Dernière réinitialisation: {stats.get('last_reset', 'Jamais')}\n"
-        text += "\n"
-    
-        # Le reste du code reste identique
-        text += "📈 *Vues par catégorie:*\n"
-        category_views = stats.get('category_views', {})
-        if category_views:
-            sorted_categories = sorted(category_views.items(), key=lambda x: x[1], reverse=True)
-            for category, views in sorted_categories:
-                if category in CATALOG:
-                    text += f"- {category}: {views} vues\n"
-        else:
-            text += "Aucune vue enregistrée.\n"
+        text = build_stats_text()
 
-        text += "\n━━━━━━━━━━━━━━━\n\n"
-    
-        text += "🔥 *Produits les plus populaires:*\n"
-        product_views = stats.get('product_views', {})
-        if product_views:
-            all_products = []
-            for category, products in product_views.items():
-                if category in CATALOG:
-                    existing_products = [p['name'] for p in CATALOG[category]]
-                    for product_name, views in products.items():
-                        if product_name in existing_products:
-                            all_products.append((category, product_name, views))
-        
-            sorted_products = sorted(all_products, key=lambda x: x[2], reverse=True)[:5]
-            for category, product_name, views in sorted_products:
-                text += f"- {product_name} ({category}): {views} vues\n"
-        else:
-            text += "Aucune vue enregistrée sur les produits.\n"
-    
         keyboard = [
             [InlineKeyboardButton("🔄 Réinitialiser les statistiques", callback_data="confirm_reset_stats")],
             [InlineKeyboardButton("🔙 Retour", callback_data="admin")]
         ]
-    
-        await query.message.edit_text(
-            text,
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
-        )
+        try:
+            await query.message.edit_text(
+                text,
+                reply_markup=InlineKeyboardMarkup(keyboard),
+                parse_mode='Markdown'
+            )
+        except Exception as e:
+            if 'not modified' not in str(e):
+                logger.error(f"Erreur lors de l'affichage des statistiques: {e}")
+
+    elif query.data == "show_metrics":
+        if str(update.effective_user.id) not in ADMIN_IDS:
+            await query.edit_message_text("❌ Vous n'êtes pas autorisé à accéder au menu d'administration.")
+            return CHOOSING
+
+        keyboard = [
+            [InlineKeyboardButton("🔄 Actualiser", callback_data="show_metrics")],
+            [InlineKeyboardButton("🔙 Retour", callback_data="admin")]
+        ]
+        try:
+            await query.message.edit_text(
+                format_metrics(),
+                reply_markup=InlineKeyboardMarkup(keyboard),
+                parse_mode='Markdown'
+            )
+        except Exception as e:
+            if 'not modified' not in str(e):
+                logger.error(f"Erreur lors de l'affichage des performances: {e}")
 
     elif query.data == "edit_contact":
             # Gérer l'affichage de la configuration actuelle
@@ -1304,25 +1883,24 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
         return await show_admin_menu(update, context)
 
     elif query.data == "back_to_categories":
-        if 'category_message_id' in context.user_data:
+        if 'category_message_id' in context.user_data and 'category_view' in context.user_data:
+            # Reconstruire la liste de produits à partir de la catégorie et de la page
+            category_view = context.user_data['category_view']
             try:
                 await context.bot.edit_message_text(
                     chat_id=query.message.chat_id,
                     message_id=context.user_data['category_message_id'],
-                    text=context.user_data['category_message_text'],
-                    reply_markup=InlineKeyboardMarkup(context.user_data['category_message_reply_markup']),
+                    text=f"*{category_view.category}*\n\n",
+                    reply_markup=InlineKeyboardMarkup(
+                        build_product_keyboard('prod', category_view.category, category_view.offset)
+                    ),
                     parse_mode='Markdown'
                 )
             except Exception as e:
-                print(f"Erreur lors de la mise à jour du message des catégories: {e}")
+                logger.error(f"Erreur lors de la mise à jour du message des catégories: {e}")
         else:
             # Si le message n'existe pas, recréez-le
-            keyboard = []
-            for category in CATALOG.keys():
-                if category != 'stats':
-                    keyboard.append([InlineKeyboardButton(category, callback_data=f"view_{category}")])
-
-            keyboard.append([InlineKeyboardButton("🔙 Retour à l'accueil", callback_data="back_to_home")])
+            keyboard = build_category_keyboard('cat')
 
             await query.edit_message_text(
                 "📋 *Menu*\n\n"
@@ -1334,146 +1912,75 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
     elif query.data == "skip_media":
         category = context.user_data.get('temp_product_category')
         if category:
-            new_product = {
-                'name': context.user_data.get('temp_product_name'),
-                'price': context.user_data.get('temp_product_price'),
-                'description': context.user_data.get('temp_product_description')
-            }
+            new_product = Product(
+                name=context.user_data.get('temp_product_name'),
+                price=context.user_data.get('temp_product_price'),
+                description=context.user_data.get('temp_product_description')
+            )
             
             if category not in CATALOG:
                 CATALOG[category] = []
             CATALOG[category].append(new_product)
             save_catalog(CATALOG)
+            SEARCH_INDEX.add_product(category, new_product)
+            catalog_changed()
             
             context.user_data.clear()
             return await show_admin_menu(update, context)
 
     elif query.data.startswith("product_"):
-                _, category, product_name = query.data.split("_", 2)
-                
-                # Trouver la vraie catégorie et le vrai produit
-                real_category = next((cat for cat in CATALOG.keys() if cat.startswith(category) or category.startswith(cat)), None)
-                if real_category:
-                    product = next((p for p in CATALOG[real_category] if p['name'].startswith(product_name) or product_name.startswith(p['name'])), None)
-                    if product:
-                        category = real_category  # Utiliser la vraie catégorie pour la suite
-                        caption = f"📱 <b>{product['name']}</b>\n\n"
-                        caption += f"💰 <b>Prix:</b>\n{product['price']}\n\n"
-                        caption += f"📝 <b>Description:</b>\n{product['description']}"
-
-                        keyboard = [[
-                            InlineKeyboardButton("🔙 Retour à la catégorie", callback_data=f"view_{category}"),
-                            InlineKeyboardButton(
-                                "🛒 Commander",
-                                **({"url": CONFIG['order_url']} if CONFIG.get('order_url') 
-                                   else {"callback_data": "show_order_text"})
+                _, short_category, short_product = query.data.split("_", 2)
+
+                view = render_product(short_category, short_product)
+                if view:
+                        category = view['category']
+                        product = view['product']
+
+                        if view['album']:
+                            album_message_ids, message = await send_product_album(query, context, view)
+                            context.user_data['last_album_message_ids'] = album_message_ids
+                        elif view['media']:
+                            message = await show_product_media(
+                                query, context, view['media'][0], view['caption'], view['reply_markups'][0]
                             )
-                        ]]
-                        if 'media' in product and product['media']:
-                            media_list = product['media']
-                            media_list = sorted(media_list, key=lambda x: x.get('order_index', 0))
-                            total_media = len(media_list)
-                            context.user_data['current_media_index'] = 0
-                            current_media = media_list[0]
-
-                            if total_media > 1:
-                                keyboard.insert(0, [
-                                    InlineKeyboardButton("⬅️ Précédent", callback_data=f"prev_media_{category[:10]}_{product['name'][:20]}"),
-                                    InlineKeyboardButton("➡️ Suivant", callback_data=f"next_media_{category[:10]}_{product['name'][:20]}")
-                                ])
-
-                            await query.message.delete()
-
-                            if current_media['media_type'] == 'photo':
-                                message = await context.bot.send_photo(
-                                    chat_id=query.message.chat_id,
-                                    photo=current_media['media_id'],
-                                    caption=caption,
-                                    reply_markup=InlineKeyboardMarkup(keyboard),
-                                    parse_mode='HTML'  # Changé en HTML au lieu de Markdown
-                                )
-                            else:
-                                message = await context.bot.send_video(
-                                    chat_id=query.message.chat_id,
-                                    video=current_media['media_id'],
-                                    caption=caption,
-                                    reply_markup=InlineKeyboardMarkup(keyboard),
-                                    parse_mode='HTML'  # Changé en HTML au lieu de Markdown
-                                )
                             context.user_data['last_product_message_id'] = message.message_id
                         else:
                             await query.message.edit_text(
-                                text=caption,
-                                reply_markup=InlineKeyboardMarkup(keyboard),
+                                text=view['caption'],
+                                reply_markup=view['reply_markups'][0],
                                 parse_mode='HTML'  # Changé en HTML au lieu de Markdown
                             )
                         if product:
                             # Incrémenter les stats du produit
-                            if 'stats' not in CATALOG:
-                                CATALOG['stats'] = {...}  # même initialisation que ci-dessus
-            
-                            if 'product_views' not in CATALOG['stats']:
-                                CATALOG['stats']['product_views'] = {}
-                            if category not in CATALOG['stats']['product_views']:
-                                CATALOG['stats']['product_views'][category] = {}
-                            if product['name'] not in CATALOG['stats']['product_views'][category]:
-                                CATALOG['stats']['product_views'][category][product['name']] = 0
-            
-                            CATALOG['stats']['product_views'][category][product['name']] += 1
-                            CATALOG['stats']['total_views'] += 1
-                            CATALOG['stats']['last_updated'] = datetime.now(paris_tz).strftime("%H:%M:%S")
+                            stats = ensure_stats()
+                            count_product_view(stats, category, product.name)
+                            record_view(stats)
                             save_catalog(CATALOG)
 
     elif query.data.startswith("view_"):
             category = query.data.replace("view_", "")
             if category in CATALOG:
-                # Initialisation des stats si nécessaire
-                if 'stats' not in CATALOG:
-                    CATALOG['stats'] = {
-                        "total_views": 0,
-                        "category_views": {},
-                        "product_views": {},
-                        "last_updated": datetime.now(paris_tz).strftime("%H:%M:%S")
-                    }
-
-                if 'category_views' not in CATALOG['stats']:
-                    CATALOG['stats']['category_views'] = {}
-    
-                if category not in CATALOG['stats']['category_views']:
-                    CATALOG['stats']['category_views'][category] = 0
-    
-                # Mettre à jour les statistiques
-                CATALOG['stats']['category_views'][category] += 1
-                CATALOG['stats']['total_views'] += 1
-                CATALOG['stats']['last_updated'] = datetime.now(paris_tz).strftime("%H:%M:%S")
+                products = CATALOG[category]
+
+                # Mettre à jour les statistiques de la catégorie et de chacun de ses produits
+                stats = ensure_stats()
+                count_category_view(stats, category)
+                for product in products:
+                    count_product_view(stats, category, product.name)
+                record_view(stats)
                 save_catalog(CATALOG)
 
-                products = CATALOG[category]
                 # Afficher la liste des produits
                 text = f"*{category}*\n\n"
-                keyboard = []
-                for product in products:
-                    keyboard.append([InlineKeyboardButton(
-                        product['name'],
-                        callback_data=f"product_{category[:10]}_{product['name'][:20]}"
-                    )])
+                keyboard = build_product_keyboard('prod', category)
 
-                keyboard.append([InlineKeyboardButton("🔙 Retour au menu", callback_data="show_categories")])
+                # Suppression du dernier message de produit (photo ou vidéo) et de son album si existent
+                if 'last_product_message_id' in context.user_data:
+                    DELETION_QUEUE.schedule(query.message.chat_id, context.user_data.pop('last_product_message_id'))
+                DELETION_QUEUE.schedule_many(query.message.chat_id, context.user_data.pop('last_album_message_ids', []))
 
                 try:
-                    # Suppression du dernier message de produit (photo ou vidéo) si existe
-                    if 'last_product_message_id' in context.user_data:
-                        try:
-                            await context.bot.delete_message(
-                                chat_id=query.message.chat_id,
-                                message_id=context.user_data['last_product_message_id']
-                            )
-                            del context.user_data['last_product_message_id']
-                        except:
-                            pass
-
-                    print(f"Texte du message : {text}")
-                    print(f"Clavier : {keyboard}")
+                    hot_logger.debug("Affichage des produits", extra={'category': category, 'products': len(CATALOG[category])})
 
                     # Éditer le message existant au lieu de le supprimer et recréer
                     await query.message.edit_text(
@@ -1483,11 +1990,10 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
                     )
                 
                     context.user_data['category_message_id'] = query.message.message_id
-                    context.user_data['category_message_text'] = text
-                    context.user_data['category_message_reply_markup'] = keyboard
+                    context.user_data['category_view'] = CategoryView(category)
 
                 except Exception as e:
-                    print(f"Erreur lors de la mise à jour du message des produits: {e}")
+                    logger.error(f"Erreur lors de la mise à jour du message des produits: {e}")
                     # Si l'édition échoue, on crée un nouveau message
                     message = await context.bot.send_message(
                         chat_id=query.message.chat_id,
@@ -1496,115 +2002,35 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
                         parse_mode='Markdown'
                     )
                     context.user_data['category_message_id'] = message.message_id
+                    context.user_data['category_view'] = CategoryView(category)
 
-                # Mettre à jour les stats des produits seulement s'il y en a
-                if products:
-                    if 'stats' not in CATALOG:
-                        CATALOG['stats'] = {
-                            "total_views": 0,
-                            "category_views": {},
-                            "product_views": {},
-                            "last_updated": datetime.now(paris_tz).strftime("%H:%M:%S"),
-                            "last_reset": datetime.now(paris_tz).strftime("%Y-%m-%d")
-                        }
-
-                    if 'product_views' not in CATALOG['stats']:
-                        CATALOG['stats']['product_views'] = {}
-                    if category not in CATALOG['stats']['product_views']:
-                        CATALOG['stats']['product_views'][category] = {}
-
-                    # Mettre à jour les stats pour chaque produit dans la catégorie
-                    for product in products:
-                        if product['name'] not in CATALOG['stats']['product_views'][category]:
-                            CATALOG['stats']['product_views'][category][product['name']] = 0
-                        CATALOG['stats']['product_views'][category][product['name']] += 1
-
-                    save_catalog(CATALOG)
-
-    elif query.data.startswith(("next_media_", "prev_media_")):
+    elif query.data.startswith(("media_", "next_media_", "prev_media_")):
             try:
-                _, direction, short_category, short_product = query.data.split("_", 3)
-            
-                # Trouver la vraie catégorie
-                category = next((cat for cat in CATALOG.keys() if cat.startswith(short_category) or short_category.startswith(cat)), None)
-                if category:
-                    # Trouver le vrai produit en utilisant le début du nom
-                    product = next((p for p in CATALOG[category] if p['name'].startswith(short_product) or short_product.startswith(p['name'])), None)
-
-                    if product and 'media' in product:
-                        media_list = sorted(product['media'], key=lambda x: x.get('order_index', 0))
-                        total_media = len(media_list)
-                        current_index = context.user_data.get('current_media_index', 0)
-
-                        # Le reste de votre code reste identique
-                        if direction == "next":
-                            current_index = current_index + 1
-                            if current_index >= total_media:
-                                current_index = 0
-                        else:  # prev
-                            current_index = current_index - 1
-                            if current_index < 0:
-                                current_index = total_media - 1
-
-                        context.user_data['current_media_index'] = current_index
-                        current_media = media_list[current_index]
-
-                        caption = f"📱 *{product['name']}*\n\n"
-                        caption += f"💰 *Prix:*\n{product['price']}\n\n"
-                        caption += f"📝 *Description:*\n{product['description']}"
-
-                        keyboard = []
-                        if total_media > 1:
-                            keyboard.append([
-                                InlineKeyboardButton("⬅️ Précédent", callback_data=f"prev_media_{short_category}_{short_product}"),
-                                InlineKeyboardButton("➡️ Suivant", callback_data=f"next_media_{short_category}_{short_product}")
-                            ])
-                        keyboard.append([
-                            InlineKeyboardButton("🔙 Retour à la catégorie", callback_data=f"view_{category}"),
-                            InlineKeyboardButton(
-                                "🛒 Commander",
-                                **({"url": CONFIG.get('order_url')} if CONFIG.get('order_url') else {"callback_data": "show_order_text"})
-                            )
-                        ])
-
-                        try:
-                            await query.message.delete()
-                        except Exception as e:
-                            print(f"Erreur lors de la suppression du message: {e}")
-
-                        if current_media['media_type'] == 'photo':
-                            message = await context.bot.send_photo(
-                                chat_id=query.message.chat_id,
-                                photo=current_media['media_id'],
-                                caption=caption,
-                                reply_markup=InlineKeyboardMarkup(keyboard),
-                                parse_mode='Markdown'
-                            )
-                        else:  # video
-                            message = await context.bot.send_video(
-                                chat_id=query.message.chat_id,
-                                video=current_media['media_id'],
-                                caption=caption,
-                                reply_markup=InlineKeyboardMarkup(keyboard),
-                                parse_mode='Markdown'
-                            )
-                        context.user_data['last_product_message_id'] = message.message_id
+                if query.data.startswith("media_"):
+                    # L'index cible est porté par le bouton : aucun état partagé entre les messages
+                    _, index, short_category, short_product = query.data.split("_", 3)
+                    current_index = int(index)
+                else:
+                    # Anciens boutons envoyés avant l'encodage de l'index
+                    _, _, short_category, short_product = query.data.split("_", 3)
+                    current_index = 0
+
+                view = render_product(short_category, short_product)
+                if view and view['media']:
+                    current_index %= len(view['media'])
+
+                    # Modification en place : un seul appel API par navigation
+                    message = await show_product_media(
+                        query, context, view['media'][current_index], view['caption'], view['reply_markups'][current_index]
+                    )
+                    context.user_data['last_product_message_id'] = message.message_id
 
             except Exception as e:
-                print(f"Erreur lors de la navigation des médias: {e}")
+                logger.error(f"Erreur lors de la navigation des médias: {e}")
                 await query.answer("Une erreur est survenue")
 
     elif query.data == "edit_product":
-        keyboard = []
-        for category in CATALOG.keys():
-            if category != 'stats':
-                keyboard.append([
-                    InlineKeyboardButton(
-                        category, 
-                        callback_data=f"editcat_{category}"  # Raccourci ici
-                    )
-                ])
-        keyboard.append([InlineKeyboardButton("🔙 Annuler", callback_data="cancel_edit")])
+        keyboard = build_category_keyboard('editcat')
         
         await query.message.edit_text(
             "✏️ Sélectionnez la catégorie du produit à modifier:",
@@ -1614,17 +2040,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
 
     elif query.data.startswith("editcat_"):  # Nouveau gestionnaire avec nom plus court
         category = query.data.replace("editcat_", "")
-        products = CATALOG.get(category, [])
-        
-        keyboard = []
-        for product in products:
-            if isinstance(product, dict):
-                # Créer un callback_data plus court
-                callback_data = f"editp_{category[:10]}_{product['name'][:20]}"
-                keyboard.append([
-                    InlineKeyboardButton(product['name'], callback_data=callback_data)
-                ])
-        keyboard.append([InlineKeyboardButton("🔙 Annuler", callback_data="cancel_edit")])
+        keyboard = build_product_keyboard('editp', category)
         
         await query.message.edit_text(
             f"✏️ Sélectionnez le produit à modifier dans {category}:",
@@ -1639,7 +2055,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
             # Trouver la vraie catégorie et le vrai produit
             category = next((cat for cat in CATALOG.keys() if cat.startswith(short_category) or short_category.startswith(cat)), None)
             if category:
-                product_name = next((p['name'] for p in CATALOG[category] if p['name'].startswith(short_product) or short_product.startswith(p['name'])), None)
+                product_name = next((p.name for p in CATALOG[category] if p.name.startswith(short_product) or short_product.startswith(p.name)), None)
                 if product_name:
                     context.user_data['editing_category'] = category
                     context.user_data['editing_product'] = product_name
@@ -1661,7 +2077,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
             
             return await show_admin_menu(update, context)
         except Exception as e:
-            print(f"Erreur dans editp_: {e}")
+            logger.error(f"Erreur dans editp_: {e}")
             return await show_admin_menu(update, context)
 
     elif query.data in ["edit_name", "edit_price", "edit_desc"]:
@@ -1676,7 +2092,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
         category = context.user_data.get('editing_category')
         product_name = context.user_data.get('editing_product')
         
-        product = next((p for p in CATALOG[category] if p['name'] == product_name), None)
+        product = next((p for p in CATALOG[category] if p.name == product_name), None)
         
         if product:
             current_value = product.get(field, "Non défini")
@@ -1709,16 +2125,20 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
         return await show_admin_menu(update, context)
 
     elif query.data == "confirm_reset_stats":
-        # Réinitialiser les statistiques
+        # Réinitialiser les statistiques (l'historique ne fait que changer d'époque)
         now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        VIEW_TIMELINE.reset()
         CATALOG['stats'] = {
             "total_views": 0,
             "category_views": {},
             "product_views": {},
             "last_updated": now.split(" ")[1],  # Juste l'heure
-            "last_reset": now.split(" ")[0]  # Juste la date
+            "last_reset": now.split(" ")[0],  # Juste la date
+            "timeline": VIEW_TIMELINE.to_dict()
         }
         save_catalog(CATALOG)
+        TOP_CATEGORIES.clear()
+        TOP_PRODUCTS.clear()
         
         # Afficher un message de confirmation
         keyboard = [[InlineKeyboardButton("🔙 Retour au menu", callback_data="admin")]]
@@ -1731,14 +2151,8 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
         )
                
     elif query.data == "show_categories":
-        keyboard = []
-        # Créer uniquement les boutons de catégories
-        for category in CATALOG.keys():
-            if category != 'stats':
-                keyboard.append([InlineKeyboardButton(category, callback_data=f"view_{category}")])
-
-        # Ajouter uniquement le bouton retour à l'accueil
-        keyboard.append([InlineKeyboardButton("🔙 Retour à l'accueil", callback_data="back_to_home")])
+        # Créer uniquement les boutons de catégories de la première page
+        keyboard = build_category_keyboard('cat')
 
         try:
             message = await query.edit_message_text(
@@ -1749,7 +2163,7 @@ async def handle_normal_buttons(update: Update, context: ContextTypes.DEFAULT_TY
             )
             context.user_data['menu_message_id'] = message.message_id
         except Exception as e:
-            print(f"Erreur lors de la mise à jour du message des catégories: {e}")
+            logger.error(f"Erreur lors de la mise à jour du message des catégories: {e}")
             # Si la mise à jour échoue, recréez le message
             message = await context.bot.send_message(
                 chat_id=query.message.chat_id,
@@ -1814,8 +2228,7 @@ async def get_file_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
         file_id = update.message.photo[-1].file_id
         CONFIG['banner_image'] = file_id
         # Sauvegarder dans config.json
-        with open('config.json', 'w', encoding='utf-8') as f:
-            json.dump(CONFIG, f, indent=4)
+        save_config()
         await update.message.reply_text(
             f"✅ Image banner enregistrée!\nFile ID: {file_id}"
         )
@@ -1883,7 +2296,7 @@ async def get_file_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
             context.user_data['menu_message_id'] = menu_message.message_id
 
     except Exception as e:
-        print(f"Erreur lors du retour à l'accueil: {e}")
+        logger.error(f"Erreur lors du retour à l'accueil: {e}")
         # En cas d'erreur, on essaie d'envoyer un nouveau message
         try:
             menu_message = await context.bot.send_message(
@@ -1894,23 +2307,17 @@ async def get_file_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             context.user_data['menu_message_id'] = menu_message.message_id
         except Exception as e:
-            print(f"Erreur critique lors du retour à l'accueil: {e}")
+            logger.error(f"Erreur critique lors du retour à l'accueil: {e}")
 
     return CHOOSING
 
-def main():
-    """Fonction principale du bot"""
-    try:
-        # Créer l'application
-        global admin_features
-        application = Application.builder().token(TOKEN).build()
-        admin_features = AdminFeatures()
-
-        # Gestionnaire de conversation principal
-        conv_handler = ConversationHandler(
+def build_conversation_handler():
+    """Gestionnaire de conversation principal"""
+    return ConversationHandler(
         entry_points=[
             CommandHandler('start', start),
             CommandHandler('admin', admin),
+            CommandHandler('search', search),
             CallbackQueryHandler(handle_normal_buttons, pattern='^(show_categories|back_to_home|admin)$'),
         ],
         states={
@@ -1989,18 +2396,49 @@ def main():
         fallbacks=[
             CommandHandler('start', start),
             CommandHandler('admin', admin),
+            CommandHandler('search', search),
         ],
         name="main_conversation",
-        persistent=False,
+        persistent=True,
     )
-    
-        application.add_handler(conv_handler)
+
+def register_handlers(application):
+    """Ajoute les handlers du bot à l'application (utilisé aussi par les benchmarks)"""
+    application.add_handler(TypeHandler(Update, track_session), group=-1)
+    application.add_handler(build_conversation_handler())
+    application.add_handler(TypeHandler(Update, finish_dispatch), group=1)
+
+def main():
+    """Fonction principale du bot"""
+    try:
+        # Le catalogue est lu en parallèle de la création et de l'initialisation de l'application
+        start_catalog_loading()
+        from handlers.admin_features import AdminFeatures
+
+        # Créer l'application
+        global admin_features
+        application = (
+            Application.builder()
+            .token(TOKEN)
+            .persistence(SQLitePersistence('bot_state.db'))
+            .rate_limiter(BotRateLimiter())
+            .post_init(start_background_tasks)
+            .post_shutdown(stop_background_tasks)
+            .build()
+        )
+        admin_features = AdminFeatures()
+
+        # Recharger la configuration et le catalogue s'ils sont modifiés hors du bot
+        FILE_WATCHER.watch(CONFIG_FILE, read_config_file, apply_config)
+        FILE_WATCHER.watch(CONFIG['catalog_file'], prepare_catalog_file, reload_catalog)
+
+        register_handlers(application)
         # Démarrer le bot
-        print("Bot démarré...")
+        logger.info("Bot démarré...")
         application.run_polling()
 
     except Exception as e:
-        print(f"Erreur lors du démarrage du bot: {e}")
+        logger.error(f"Erreur lors du démarrage du bot: {e}")
 
 if __name__ == '__main__':
     main()
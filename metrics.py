@@ -0,0 +1,171 @@
+import asyncio
+import functools
+import logging
+import re
+import time
+from array import array
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+# Bornes des seaux de latence, en secondes
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Désactivé, chaque point de mesure se réduit à un test de ce booléen
+ENABLED = True
+
+# Nombre maximum de valeurs d'étiquette par famille (les callbacks viennent des clients)
+MAX_LABELS = 64
+
+class Histogram:
+    """Histogramme à seaux fixes : enregistrement en O(log n seaux), mémoire constante"""
+
+    def __init__(self, name, label=None, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.label = label
+        self.buckets = tuple(buckets)
+        # Un seau de plus pour les valeurs au-delà de la dernière borne
+        self.counts = array('Q', [0] * (len(self.buckets) + 1))
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q):
+        """Borne supérieure du seau contenant le q-ième centile (0 < q <= 100)"""
+        if not self.count:
+            return 0.0
+        rank = self.count * q / 100
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.sum = 0.0
+
+# Histogrammes de l'application : (famille, étiquette) -> Histogram
+HISTOGRAMS = {}
+_labels_per_family = {}
+
+def get_histogram(name, label=None, buckets=DEFAULT_BUCKETS):
+    histogram = HISTOGRAMS.get((name, label))
+    if histogram is None:
+        if _labels_per_family.get(name, 0) >= MAX_LABELS:
+            # Étiquettes au-delà de la limite regroupées sous 'other', créé hors quota
+            label = 'other'
+            histogram = HISTOGRAMS.get((name, label))
+            if histogram is None:
+                histogram = HISTOGRAMS[(name, label)] = Histogram(name, label, buckets)
+            return histogram
+        _labels_per_family[name] = _labels_per_family.get(name, 0) + 1
+        histogram = HISTOGRAMS[(name, label)] = Histogram(name, label, buckets)
+    return histogram
+
+def observe(name, label, seconds):
+    if ENABLED:
+        get_histogram(name, label).observe(seconds)
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+def timed(name, label=None):
+    """Décorateur : mesure la durée de chaque appel (fonction normale ou coroutine)"""
+    def decorator(func):
+        histogram_label = label or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not ENABLED:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    get_histogram(name, histogram_label).observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                get_histogram(name, histogram_label).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def summary():
+    """Histogrammes non vides triés par temps total décroissant"""
+    return sorted((h for h in HISTOGRAMS.values() if h.count), key=lambda h: h.sum, reverse=True)
+
+def _metric_name(name):
+    return 'bot_' + re.sub(r'[^a-zA-Z0-9_]', '_', name) + '_seconds'
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus_text():
+    """Export au format texte de Prometheus (histogrammes cumulatifs)"""
+    families = {}
+    for (name, label), histogram in HISTOGRAMS.items():
+        families.setdefault(name, []).append((label, histogram))
+
+    lines = []
+    for name in sorted(families):
+        metric = _metric_name(name)
+        lines.append(f'# TYPE {metric} histogram')
+        for label, histogram in families[name]:
+            labels = f'name="{_label_value(label)}"' if label is not None else ''
+            sep = ',' if labels else ''
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{labels}{sep}le="+Inf"}} {histogram.count}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{metric}_sum{suffix} {histogram.sum}')
+            lines.append(f'{metric}_count{suffix} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+async def _handle_http(reader, writer):
+    try:
+        request_line = await reader.readline()
+        # Ignorer les en-têtes de la requête
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+        parts = request_line.decode('latin-1').split()
+        if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+            status, body = '200 OK', prometheus_text().encode('utf-8')
+        else:
+            status, body = '404 Not Found', b'not found\n'
+        writer.write(
+            f'HTTP/1.1 {status}\r\n'
+            f'Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: close\r\n\r\n'.encode('latin-1') + body
+        )
+        await writer.drain()
+    except Exception as e:
+        logger.error(f"Erreur lors de l'export des métriques: {e}")
+    finally:
+        writer.close()
+
+async def serve_prometheus(host='127.0.0.1', port=9100):
+    """Sert GET /metrics au format Prometheus jusqu'à l'arrêt de l'application"""
+    server = await asyncio.start_server(_handle_http, host, port)
+    logger.info(f"Métriques Prometheus disponibles sur http://{host}:{port}/metrics")
+    async with server:
+        await server.serve_forever()
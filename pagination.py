@@ -0,0 +1,49 @@
+from itertools import islice
+from telegram import InlineKeyboardButton
+
+# Nombre de boutons affichés par page dans les menus
+PAGE_SIZE = 8
+
+def clamp_offset(offset, total, page_size=PAGE_SIZE):
+    """Ramène l'offset sur le début d'une page existante"""
+    if total <= 0 or offset < 0:
+        return 0
+    if offset >= total:
+        offset = total - 1
+    return offset - offset % page_size
+
+def page_callback(menu, offset, arg=None):
+    """Construit le callback_data d'une page : pg_<menu>_<offset>[_<arg>]"""
+    if arg is None:
+        return f"pg_{menu}_{offset}"
+    return f"pg_{menu}_{offset}_{arg}"
+
+def parse_page_callback(data):
+    """Décode un callback_data construit par page_callback"""
+    parts = data.split("_", 3)
+    menu = parts[1]
+    offset = int(parts[2])
+    arg = parts[3] if len(parts) > 3 else None
+    return menu, offset, arg
+
+def paginated_keyboard(items, total, offset, make_button, menu, arg=None, page_size=PAGE_SIZE):
+    """
+    Construit le clavier d'une seule page.
+    Seuls les éléments de la page sont transformés en boutons, `items` peut être un itérable paresseux.
+    """
+    offset = clamp_offset(offset, total, page_size)
+    keyboard = [[make_button(item)] for item in islice(items, offset, offset + page_size)]
+
+    if total > page_size:
+        navigation = []
+        if offset > 0:
+            navigation.append(InlineKeyboardButton("⬅️", callback_data=page_callback(menu, offset - page_size, arg)))
+        navigation.append(InlineKeyboardButton(
+            f"{offset // page_size + 1}/{(total - 1) // page_size + 1}",
+            callback_data="noop"
+        ))
+        if offset + page_size < total:
+            navigation.append(InlineKeyboardButton("➡️", callback_data=page_callback(menu, offset + page_size, arg)))
+        keyboard.append(navigation)
+
+    return keyboard
@@ -0,0 +1,148 @@
+import logging
+import asyncio
+import json
+import pickle
+import sqlite3
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+class SQLitePersistence(BasePersistence):
+    """
+    Persistance des conversations et des user_data/chat_data/bot_data dans SQLite.
+    L'application n'appelle les méthodes update_* que pour les entrées modifiées,
+    tous les `update_interval` secondes : les écritures d'un même passage sont
+    regroupées dans une seule transaction.
+    """
+
+    def __init__(self, filepath='bot_state.db', update_interval=30):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=True, chat_data=True, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.conn = sqlite3.connect(filepath, check_same_thread=False)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS user_data (
+                user_id INTEGER PRIMARY KEY,
+                data BLOB
+            );
+
+            CREATE TABLE IF NOT EXISTS chat_data (
+                chat_id INTEGER PRIMARY KEY,
+                data BLOB
+            );
+
+            CREATE TABLE IF NOT EXISTS bot_data (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                data BLOB
+            );
+
+            CREATE TABLE IF NOT EXISTS conversations (
+                name TEXT,
+                key TEXT,
+                state TEXT,
+                PRIMARY KEY (name, key)
+            );
+        ''')
+        self.conn.commit()
+        self.commit_scheduled = False
+
+    def _schedule_commit(self):
+        """Valide la transaction une seule fois, après toutes les écritures du passage en cours"""
+        if self.commit_scheduled:
+            return
+        self.commit_scheduled = True
+        try:
+            asyncio.get_running_loop().call_soon(self._commit)
+        except RuntimeError:
+            self._commit()
+
+    def _commit(self):
+        self.commit_scheduled = False
+        try:
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Erreur lors de la sauvegarde de la persistance: {e}")
+
+    def _load_table(self, table, key_column):
+        rows = self.conn.execute(f'SELECT {key_column}, data FROM {table}').fetchall()
+        result = {}
+        for key, data in rows:
+            try:
+                result[key] = pickle.loads(data)
+            except Exception as e:
+                logger.warning(f"Donnée illisible ignorée ({table} {key}): {e}")
+        return result
+
+    async def get_user_data(self):
+        return self._load_table('user_data', 'user_id')
+
+    async def get_chat_data(self):
+        return self._load_table('chat_data', 'chat_id')
+
+    async def get_bot_data(self):
+        row = self.conn.execute('SELECT data FROM bot_data WHERE id = 0').fetchone()
+        return pickle.loads(row[0]) if row else {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        rows = self.conn.execute('SELECT key, state FROM conversations WHERE name = ?', (name,)).fetchall()
+        return {tuple(json.loads(key)): json.loads(state) for key, state in rows}
+
+    async def update_conversation(self, name, key, new_state):
+        if new_state is None:
+            self.conn.execute('DELETE FROM conversations WHERE name = ? AND key = ?', (name, json.dumps(key)))
+        else:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO conversations (name, key, state) VALUES (?, ?, ?)',
+                (name, json.dumps(key), json.dumps(new_state))
+            )
+        self._schedule_commit()
+
+    async def update_user_data(self, user_id, data):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO user_data (user_id, data) VALUES (?, ?)',
+            (user_id, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        )
+        self._schedule_commit()
+
+    async def update_chat_data(self, chat_id, data):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO chat_data (chat_id, data) VALUES (?, ?)',
+            (chat_id, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        )
+        self._schedule_commit()
+
+    async def update_bot_data(self, data):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO bot_data (id, data) VALUES (0, ?)',
+            (pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL),)
+        )
+        self._schedule_commit()
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_user_data(self, user_id):
+        self.conn.execute('DELETE FROM user_data WHERE user_id = ?', (user_id,))
+        self._schedule_commit()
+
+    async def drop_chat_data(self, chat_id):
+        self.conn.execute('DELETE FROM chat_data WHERE chat_id = ?', (chat_id,))
+        self._schedule_commit()
+
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    async def flush(self):
+        """Appelé à l'arrêt de l'application"""
+        self._commit()
+        self.conn.close()
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+import metrics
+
+# Méthodes d'édition : deux éditions successives du même message sont fusionnées
+EDIT_ENDPOINTS = frozenset({
+    'editMessageText', 'editMessageCaption', 'editMessageMedia', 'editMessageReplyMarkup'
+})
+
+class TokenBucket:
+    """Seau à jetons : `rate` appels par seconde en moyenne, rafales de `capacity` appels"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def is_full(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class PendingEdit:
+    """Édition en attente d'envoi, éventuellement remplacée par une édition plus récente"""
+    __slots__ = ('future', 'replaced_by')
+
+    def __init__(self):
+        self.future = asyncio.get_running_loop().create_future()
+        # Évite l'avertissement "exception never retrieved" si personne n'attend le résultat
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.replaced_by = None
+
+class BotRateLimiter(BaseRateLimiter):
+    """
+    Couche unique par laquelle passent tous les appels à l'API Bot de l'application :
+    - limite globale (30 appels/s) et limite par groupe (20 appels/min), comme AIORateLimiter :
+      les updates étant traitées une à une, limiter aussi chaque chat privé ferait attendre tous les
+      autres utilisateurs derrière celui qui enchaîne les clics,
+    - nouvelle tentative automatique après un RetryAfter, en suspendant tous les envois,
+    - fusion des éditions d'un même message en attente en même temps (pause RetryAfter, limite
+      atteinte) : seule la dernière est envoyée,
+    - histogramme de latence par méthode (famille 'api' de metrics.py).
+    """
+
+    # Au-delà de ce nombre de groupes suivis, les seaux pleins (groupes inactifs) sont oubliés
+    MAX_CHAT_BUCKETS = 10_000
+
+    def __init__(self, global_rate=30, group_rate=20 / 60, burst=5, max_retries=2):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.group_rate = group_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.chat_buckets = {}
+        self.pending_edits = {}
+        self.paused_until = 0.0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _chat_bucket(self, chat_id):
+        """Seau d'un groupe ou d'un canal (id négatif ou @nom) ; None pour un chat privé"""
+        if not (isinstance(chat_id, str) or isinstance(chat_id, int) and chat_id < 0):
+            return None
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= self.MAX_CHAT_BUCKETS:
+                self.chat_buckets = {key: value for key, value in self.chat_buckets.items() if not value.is_full()}
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.group_rate, self.burst)
+        return bucket
+
+    async def _acquire(self, chat_id):
+        pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        bucket = self._chat_bucket(chat_id)
+        if bucket is not None:
+            await bucket.acquire()
+        await self.global_bucket.acquire()
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get('chat_id')
+
+        edit = None
+        if endpoint in EDIT_ENDPOINTS and chat_id is not None and 'message_id' in data:
+            edit_key = (endpoint, chat_id, data['message_id'])
+            edit = PendingEdit()
+            previous = self.pending_edits.get(edit_key)
+            if previous is not None:
+                previous.replaced_by = edit
+            self.pending_edits[edit_key] = edit
+
+        await self._acquire(chat_id)
+
+        if edit is not None:
+            if self.pending_edits.get(edit_key) is edit:
+                del self.pending_edits[edit_key]
+            if edit.replaced_by is not None:
+                # Une édition plus récente du même message a été demandée entre-temps :
+                # celle-ci n'est pas envoyée et renvoie le résultat de la plus récente
+                try:
+                    result = await asyncio.shield(edit.replaced_by.future)
+                except Exception as e:
+                    edit.future.set_exception(e)
+                    raise
+                edit.future.set_result(result)
+                return result
+
+        max_retries = rate_limit_args if isinstance(rate_limit_args, int) else self.max_retries
+        try:
+            for attempt in range(max_retries + 1):
+                start = time.perf_counter()
+                try:
+                    result = await callback(*args, **kwargs)
+                    metrics.observe('api', endpoint, time.perf_counter() - start)
+                    break
+                except RetryAfter as e:
+                    metrics.observe('api', endpoint, time.perf_counter() - start)
+                    if attempt == max_retries:
+                        raise
+                    delay = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+                    self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                    await self._acquire(chat_id)
+        except Exception as e:
+            if edit is not None:
+                edit.future.set_exception(e)
+            raise
+
+        if edit is not None:
+            edit.future.set_result(result)
+        return result
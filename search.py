@@ -0,0 +1,116 @@
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from itertools import islice
+
+TOKEN_PATTERN = re.compile(r"\w+", flags=re.UNICODE)
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# Longueur minimale d'un préfixe indexé (recherche "à la frappe")
+MIN_PREFIX_LENGTH = 2
+
+# Candidats examinés au plus par recherche à plusieurs mots (borne le pire cas)
+MAX_SCANNED = 2000
+
+def normalize(text):
+    """Met en minuscules et retire les accents (é -> e, ç -> c...)"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def tokenize(text):
+    """Découpe un texte (éventuellement HTML) en mots normalisés"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(normalize(HTML_TAG_PATTERN.sub(" ", text)))
+
+class SearchIndex:
+    """
+    Index inversé du catalogue : préfixe de mot -> produits, en liste triée.
+    Les documents sont identifiés par (catégorie, nom du produit).
+    Les listes étant triées, une recherche s'arrête dès qu'elle a `limit` résultats :
+    son coût ne dépend pas de la taille du catalogue.
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.documents = {}
+
+    def build(self, catalog):
+        """Reconstruit l'index complet à partir du catalogue"""
+        self.documents = {}
+        for category, products in catalog.items():
+            if category == 'stats':
+                continue
+            for product in products:
+                self.documents[(category, product.name)] = self._prefixes(product)
+
+        # Documents parcourus dans l'ordre : chaque liste est remplie déjà triée
+        self.index = {}
+        for key in sorted(self.documents):
+            for prefix in self.documents[key]:
+                self.index.setdefault(prefix, []).append(key)
+
+    def _prefixes(self, product):
+        prefixes = set()
+        for field in ('name', 'description'):
+            for token in tokenize(getattr(product, field)):
+                for length in range(min(MIN_PREFIX_LENGTH, len(token)), len(token) + 1):
+                    prefixes.add(token[:length])
+        return prefixes
+
+    def add_product(self, category, product):
+        """Indexe (ou réindexe) un produit"""
+        key = (category, product.name)
+        self.remove_product(category, product.name)
+
+        prefixes = self._prefixes(product)
+        self.documents[key] = prefixes
+        for prefix in prefixes:
+            insort(self.index.setdefault(prefix, []), key)
+
+    def remove_product(self, category, product_name):
+        """Retire un produit de l'index"""
+        key = (category, product_name)
+        for prefix in self.documents.pop(key, ()):
+            keys = self.index.get(prefix)
+            if keys is None:
+                continue
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+            if not keys:
+                del self.index[prefix]
+
+    def remove_category(self, category):
+        """Retire tous les produits d'une catégorie de l'index"""
+        for key in [key for key in self.documents if key[0] == category]:
+            self.remove_product(*key)
+
+    def search(self, query, limit=10):
+        """
+        Retourne les premiers (catégorie, produit), dans l'ordre, contenant tous les mots de la requête.
+        La plus courte des listes est parcourue dans l'ordre, les autres mots sont vérifiés sur les
+        préfixes du document ; au plus MAX_SCANNED candidats sont examinés.
+        """
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+
+        postings = []
+        for token in tokens:
+            keys = self.index.get(token)
+            if not keys:
+                return []
+            postings.append((len(keys), token, keys))
+        postings.sort()
+        candidates = postings[0][2]
+        others = frozenset(token for _, token, _ in postings[1:])
+
+        results = []
+        documents = self.documents
+        for key in islice(candidates, MAX_SCANNED):
+            if documents[key].issuperset(others):
+                results.append(key)
+                if len(results) == limit:
+                    break
+        return results
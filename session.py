@@ -0,0 +1,46 @@
+import time
+from collections import OrderedDict
+
+class MessageRef:
+    """Référence compacte vers un message, à garder à la place de l'objet Message"""
+    __slots__ = ('chat_id', 'message_id')
+
+    def __init__(self, chat_id, message_id):
+        self.chat_id = chat_id
+        self.message_id = message_id
+
+class CategoryView:
+    """Liste de produits affichée à l'utilisateur : le clavier est reconstruit à la demande"""
+    __slots__ = ('category', 'offset')
+
+    def __init__(self, category, offset=0):
+        self.category = category
+        self.offset = offset
+
+class SessionTracker:
+    """
+    Dernière activité de chaque utilisateur, de la plus ancienne à la plus récente.
+    Permet de retrouver en O(1) par utilisateur les sessions inactives à évincer.
+    """
+
+    def __init__(self, ttl, maxsize=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.last_seen = OrderedDict()
+
+    def touch(self, user_id):
+        self.last_seen[user_id] = time.monotonic()
+        self.last_seen.move_to_end(user_id)
+
+    def pop_idle(self):
+        """Retire et retourne les utilisateurs inactifs depuis plus de ttl secondes, ou en trop au-delà de maxsize"""
+        now = time.monotonic()
+        idle = []
+        while self.last_seen:
+            user_id, seen = next(iter(self.last_seen.items()))
+            over_capacity = self.maxsize is not None and len(self.last_seen) > self.maxsize
+            if now - seen < self.ttl and not over_capacity:
+                break
+            self.last_seen.popitem(last=False)
+            idle.append(user_id)
+        return idle
@@ -0,0 +1,116 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog_model
+from catalog_model import (
+    PHOTO, VIDEO, Media, Product, catalog_from_json, catalog_to_json,
+    read_snapshot, snapshot_is_current, write_snapshot
+)
+
+def sample_json():
+    return {
+        'Fleurs': [
+            {
+                'name': 'Bouquet',
+                'price': '20€',
+                'description': 'Roses',
+                'media': [
+                    {'media_id': 'v1', 'media_type': 'video', 'order_index': 2},
+                    {'media_id': 'p1', 'media_type': 'photo', 'order_index': 1, 'caption': 'face'},
+                ],
+                'view_mode': 'album',
+                'promo': True,
+            },
+            {'name': 'Vase'},
+        ],
+        'Vide': [],
+        'stats': {'total_views': 4, 'category_views': {'Fleurs': 4}, 'product_views': {'Fleurs': {'Bouquet': 4}}},
+    }
+
+def test_json_round_trip_keeps_unknown_keys_and_sorts_media():
+    data = sample_json()
+    catalog = catalog_from_json(data)
+
+    bouquet, vase = catalog['Fleurs']
+    assert [media.media_id for media in bouquet.media] == ['p1', 'v1']
+    assert bouquet.media[0].media_type is PHOTO and bouquet.media[1].media_type is VIDEO
+    assert vase.price is None and vase.media is None
+
+    expected = sample_json()
+    expected['Fleurs'][0]['media'].reverse()
+    assert catalog_to_json(catalog) == expected
+
+def test_mapping_access():
+    product = Product.from_dict({'name': 'Bouquet', 'promo': True})
+    assert product['name'] == 'Bouquet'
+    assert product['promo'] is True
+    assert 'name' in product and 'price' not in product
+    assert product.get('price', '-') == '-'
+    with pytest.raises(KeyError):
+        product['price']
+
+    product['price'] = '5€'
+    product['color'] = 'rouge'
+    assert product.price == '5€'
+    assert product.to_dict() == {'name': 'Bouquet', 'price': '5€', 'promo': True, 'color': 'rouge'}
+
+def test_repeated_strings_are_shared():
+    catalog = catalog_from_json({
+        'A': [{'name': ''.join(['Mo', 'dèle']), 'price': ''.join(['1', '0€'])}],
+        'B': [{'name': ''.join(['Mod', 'èle']), 'price': ''.join(['10', '€'])}],
+    })
+    assert catalog['A'][0].name is catalog['B'][0].name
+    assert catalog['A'][0].price is catalog['B'][0].price
+
+@pytest.mark.parametrize('data', [
+    [],
+    {'A': {'name': 'pas une liste'}},
+    {'A': [{'price': 'sans nom'}]},
+    {'A': [{'name': 'X', 'media': [{'media_id': 'm'}]}]},
+    {'A': [{'name': 'X', 'media': [{'media_id': 'm', 'media_type': 'audio'}]}]},
+])
+def test_invalid_catalogs_raise_value_error(data):
+    with pytest.raises(ValueError):
+        catalog_from_json(data)
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'catalog.snapshot')
+    catalog = catalog_from_json(sample_json())
+    write_snapshot(path, catalog)
+    assert not os.path.exists(f"{path}.tmp")
+
+    restored = read_snapshot(path)
+    assert catalog_to_json(restored) == catalog_to_json(catalog)
+    assert isinstance(restored['Fleurs'][0], Product)
+    assert isinstance(restored['Fleurs'][0].media[0], Media)
+    assert restored['Fleurs'][0].media[0].media_type is PHOTO
+
+def test_snapshot_header_is_checked(tmp_path, monkeypatch):
+    path = str(tmp_path / 'catalog.snapshot')
+    with open(path, 'wb') as f:
+        f.write(b'{"pas": "un snapshot"}')
+    with pytest.raises(ValueError):
+        read_snapshot(path)
+
+    write_snapshot(path, {'A': []})
+    monkeypatch.setattr(catalog_model, 'SNAPSHOT_VERSION', catalog_model.SNAPSHOT_VERSION + 1)
+    with pytest.raises(ValueError):
+        read_snapshot(path)
+
+def test_snapshot_is_current(tmp_path):
+    snapshot = str(tmp_path / 'catalog.snapshot')
+    json_path = str(tmp_path / 'catalog.json')
+    assert not snapshot_is_current(snapshot, json_path)
+
+    write_snapshot(snapshot, {})
+    assert snapshot_is_current(snapshot, json_path)
+
+    with open(json_path, 'w', encoding='utf-8') as f:
+        f.write('{}')
+    os.utime(snapshot, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(json_path, ns=(2_000_000_000, 2_000_000_000))
+    assert not snapshot_is_current(snapshot, json_path)
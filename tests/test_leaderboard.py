@@ -0,0 +1,41 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import Leaderboard
+
+def test_rebuild_keeps_the_k_largest():
+    board = Leaderboard(3)
+    board.rebuild([('a', 5), ('b', 1), ('c', 9), ('d', 7), ('e', 2)])
+    assert board.items() == [('c', 9), ('d', 7), ('a', 5)]
+
+def test_updates_match_a_full_sort():
+    rng = random.Random(1)
+    counts = {}
+    board = Leaderboard(5)
+    for _ in range(5000):
+        key = rng.randrange(200)
+        counts[key] = counts.get(key, 0) + 1
+        board.update(key, counts[key])
+        assert len(board.members) <= 5
+
+    expected = sorted(counts.values(), reverse=True)[:5]
+    assert [views for _, views in board.items()] == expected
+    for key, views in board.items():
+        assert counts[key] == views
+
+def test_new_key_enters_only_above_the_lowest():
+    board = Leaderboard(2)
+    board.rebuild([('a', 3), ('b', 2)])
+    board.update('c', 2)
+    assert dict(board.items()) == {'a': 3, 'b': 2}
+    board.update('c', 3)
+    assert dict(board.items()) == {'a': 3, 'c': 3}
+
+def test_clear():
+    board = Leaderboard(2)
+    board.update('a', 1)
+    board.clear()
+    assert board.items() == []
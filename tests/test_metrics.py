@@ -0,0 +1,17 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+def test_labels_over_limit_go_to_other():
+    for i in range(metrics.MAX_LABELS + 6):
+        metrics.observe('overflow_test', f'x{i}', 0.001)
+
+    labels = {label for name, label in metrics.HISTOGRAMS if name == 'overflow_test'}
+    assert len(labels) == metrics.MAX_LABELS + 1
+    assert metrics.HISTOGRAMS[('overflow_test', 'other')].count == 6
+    # Une étiquette déjà connue garde son propre histogramme
+    metrics.observe('overflow_test', 'x0', 0.001)
+    assert metrics.HISTOGRAMS[('overflow_test', 'x0')].count == 2
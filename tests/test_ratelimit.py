@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import BotRateLimiter
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+class FakeApi:
+    """Enregistre les appels qui atteignent réellement l'API"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call(self, endpoint, data):
+        self.calls.append((endpoint, dict(data)))
+        return data.get('text')
+
+    def request(self, limiter, endpoint, **data):
+        return limiter.process_request(self.call, (endpoint, data), {}, endpoint, data, None)
+
+def test_pending_edits_of_same_message_are_coalesced():
+    async def scenario():
+        limiter = BotRateLimiter()
+        api = FakeApi()
+        # Envois suspendus (comme après un RetryAfter) : les éditions s'accumulent
+        limiter.paused_until = time.monotonic() + 0.05
+        results = await asyncio.gather(
+            api.request(limiter, 'editMessageText', chat_id=1, message_id=7, text='page 1'),
+            api.request(limiter, 'editMessageText', chat_id=1, message_id=7, text='page 2'),
+            api.request(limiter, 'editMessageText', chat_id=1, message_id=7, text='page 3'),
+            api.request(limiter, 'editMessageText', chat_id=1, message_id=8, text='autre message'),
+        )
+        return api.calls, results
+
+    calls, results = run(scenario())
+    assert calls == [
+        ('editMessageText', {'chat_id': 1, 'message_id': 7, 'text': 'page 3'}),
+        ('editMessageText', {'chat_id': 1, 'message_id': 8, 'text': 'autre message'}),
+    ]
+    # Les éditions remplacées renvoient le résultat de la dernière
+    assert results == ['page 3', 'page 3', 'page 3', 'autre message']
+
+def test_sequential_edits_are_all_sent():
+    async def scenario():
+        limiter = BotRateLimiter()
+        api = FakeApi()
+        for text in ('a', 'b'):
+            await api.request(limiter, 'editMessageText', chat_id=1, message_id=7, text=text)
+        return api.calls
+
+    assert [data['text'] for _, data in run(scenario())] == ['a', 'b']
+
+def test_private_chats_only_use_the_global_limit():
+    async def scenario():
+        limiter = BotRateLimiter()
+        api = FakeApi()
+        start = time.monotonic()
+        for i in range(20):
+            await api.request(limiter, 'sendMessage', chat_id=42, text=str(i))
+        return limiter, time.monotonic() - start
+
+    limiter, elapsed = run(scenario())
+    assert elapsed < 0.5
+    assert limiter.chat_buckets == {}
+
+def test_groups_have_their_own_bucket():
+    async def scenario():
+        limiter = BotRateLimiter(burst=2)
+        api = FakeApi()
+        for _ in range(2):
+            await api.request(limiter, 'sendMessage', chat_id=-100, text='x')
+        return limiter
+
+    limiter = run(scenario())
+    assert list(limiter.chat_buckets) == [-100]
+    assert limiter.chat_buckets[-100].tokens < 1
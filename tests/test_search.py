@@ -0,0 +1,86 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import search
+from catalog_model import Product
+from search import SearchIndex
+
+def build(catalog):
+    index = SearchIndex()
+    index.build(catalog)
+    return index
+
+CATALOG = {
+    'Boissons': [
+        Product('Café crème', '3€', "Un <b>café</b> doux"),
+        Product('Thé vert', '2€', "Infusion japonaise"),
+    ],
+    'Épicerie': [
+        Product('Chocolat noir', '4€', "Cacao 70%, goût café"),
+    ],
+    'stats': {'total_views': 3},
+}
+
+def test_accents_case_and_prefixes():
+    index = build(CATALOG)
+    assert index.search('CAFE') == [('Boissons', 'Café crème'), ('Épicerie', 'Chocolat noir')]
+    assert index.search('epic') == []
+    assert index.search('choc') == [('Épicerie', 'Chocolat noir')]
+    assert index.search('infusion japon') == [('Boissons', 'Thé vert')]
+
+def test_all_words_must_match():
+    index = build(CATALOG)
+    assert index.search('cafe doux') == [('Boissons', 'Café crème')]
+    assert index.search('cafe vert') == []
+    assert index.search('introuvable') == []
+    assert index.search('   ') == []
+
+def test_html_tags_are_not_indexed():
+    index = build(CATALOG)
+    assert index.search('b') == []
+
+def test_limit_returns_the_first_results_in_order():
+    catalog = {'Cat': [Product(f'Article {i:03}', None, "commun") for i in range(50)]}
+    index = build(catalog)
+    assert index.search('commun', limit=5) == [('Cat', f'Article {i:03}') for i in range(5)]
+
+def test_incremental_updates_match_a_rebuild():
+    index = build(CATALOG)
+    added = Product('Café glacé', '4€', "Boisson d'été")
+    index.add_product('Boissons', added)
+    index.remove_product('Boissons', 'Thé vert')
+    # Réindexer un produit existant remplace ses anciens préfixes
+    index.add_product('Épicerie', Product('Chocolat noir', '4€', "Cacao 85%"))
+
+    expected = build({
+        'Boissons': [CATALOG['Boissons'][0], added],
+        'Épicerie': [Product('Chocolat noir', '4€', "Cacao 85%")],
+    })
+    assert index.documents == expected.documents
+    assert index.index == expected.index
+    assert index.search('cafe') == [('Boissons', 'Café crème'), ('Boissons', 'Café glacé')]
+
+def test_remove_category():
+    index = build(CATALOG)
+    index.remove_category('Boissons')
+    assert index.search('cafe') == [('Épicerie', 'Chocolat noir')]
+    assert all(key[0] != 'Boissons' for keys in index.index.values() for key in keys)
+
+def test_scan_cutoff_returns_a_prefix_of_the_exact_results(monkeypatch):
+    rng = random.Random(3)
+    words = ['rouge', 'bleu', 'vert', 'jaune', 'noir', 'blanc']
+    catalog = {'Cat': [
+        Product(f'Produit {i:04}', None, " ".join(rng.sample(words, 2)))
+        for i in range(500)
+    ]}
+    index = build(catalog)
+    exact = index.search('rouge bleu', limit=1000)
+    assert exact
+
+    monkeypatch.setattr(search, 'MAX_SCANNED', 50)
+    truncated = index.search('rouge bleu', limit=1000)
+    assert len(truncated) < len(exact)
+    assert truncated == exact[:len(truncated)]
@@ -0,0 +1,66 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timeline import DAY_SLOTS, HOUR_SLOTS, ViewTimeline
+
+HOUR = 3600
+DAY = 86400
+# Début d'un jour, pour que les heures et les jours tombent juste
+T0 = 20_000 * DAY
+
+def test_windows():
+    timeline = ViewTimeline()
+    timeline.record(T0 - 2 * DAY)
+    timeline.record(T0 - 5 * HOUR)
+    timeline.record(T0 + 10)
+    timeline.record(T0 + HOUR + 10)
+
+    now = T0 + HOUR + 20
+    assert timeline.last_hours(1, now) == 1
+    assert timeline.last_hours(2, now) == 2
+    assert timeline.last_hours(24, now) == 3
+    assert timeline.last_days(1, now) == 2
+    assert timeline.last_days(3, now) == 4
+
+def test_old_slots_are_recycled():
+    timeline = ViewTimeline()
+    timeline.record(T0)
+    # Même créneau horaire, HOUR_SLOTS heures plus tard
+    later = T0 + HOUR_SLOTS * HOUR
+    timeline.record(later)
+    assert timeline.last_hours(HOUR_SLOTS, later) == 1
+    # Une fenêtre plus longue que le tampon est bornée à sa taille
+    assert timeline.last_hours(10 * HOUR_SLOTS, later) == 1
+
+    timeline = ViewTimeline()
+    timeline.record(T0)
+    much_later = T0 + DAY_SLOTS * DAY
+    timeline.record(much_later)
+    assert timeline.last_days(DAY_SLOTS, much_later) == 1
+
+def test_reset_ignores_earlier_views():
+    timeline = ViewTimeline()
+    timeline.record(T0)
+    timeline.record(T0 + 10)
+    timeline.reset(T0 + 20)
+    timeline.record(T0 + 30)
+    assert timeline.last_hours(24, T0 + 40) == 1
+    assert timeline.last_days(30, T0 + 40) == 1
+
+def test_dict_round_trip():
+    timeline = ViewTimeline()
+    timeline.record(T0)
+    timeline.reset(T0 + HOUR)
+    timeline.record(T0 + HOUR + 1)
+
+    restored = ViewTimeline.from_dict(timeline.to_dict())
+    assert restored.to_dict() == timeline.to_dict()
+    assert restored.last_days(1, T0 + HOUR + 2) == 1
+
+def test_invalid_dict_gives_an_empty_timeline():
+    assert ViewTimeline.from_dict(None).last_days(30, T0) == 0
+    timeline = ViewTimeline.from_dict({'hour_stamps': [1, 2], 'day_stamps': []})
+    assert timeline.last_hours(24, T0) == 0
+    assert ViewTimeline.from_dict({'oops': 1}).last_days(30, T0) == 0
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watcher import FileWatcher
+
+def write(path, text, mtime_ns):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    # Dates explicites : deux écritures rapprochées peuvent sinon avoir la même
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+def test_edit_outside_blocks_writes_until_reloaded(tmp_path):
+    path = str(tmp_path / 'catalog.json')
+    write(path, 'v1', 1_000_000_000)
+    applied = []
+    watcher = FileWatcher()
+    watcher.watch(path, read, applied.append)
+    assert not watcher.changed_outside(path)
+
+    write(path, 'edited by hand', 2_000_000_000)
+    assert watcher.changed_outside(path)
+
+    asyncio.run(watcher.check())
+    assert applied == ['edited by hand']
+    assert not watcher.changed_outside(path)
+
+def test_bot_writes_are_not_reloaded(tmp_path):
+    path = str(tmp_path / 'config.json')
+    write(path, 'v1', 1_000_000_000)
+    applied = []
+    watcher = FileWatcher()
+    watcher.watch(path, read, applied.append)
+
+    write(path, 'written by the bot', 2_000_000_000)
+    watcher.mark_written(path)
+    assert not watcher.changed_outside(path)
+    asyncio.run(watcher.check())
+    assert applied == []
+
+def test_invalid_edit_is_skipped_once(tmp_path):
+    path = str(tmp_path / 'config.json')
+    write(path, 'v1', 1_000_000_000)
+    calls = []
+
+    def load(path):
+        calls.append(path)
+        raise ValueError("invalide")
+
+    watcher = FileWatcher()
+    watcher.watch(path, load, lambda data: None)
+    write(path, '{', 2_000_000_000)
+    asyncio.run(watcher.check())
+    asyncio.run(watcher.check())
+    assert len(calls) == 1
+    assert not watcher.changed_outside(path)
+
+def test_unwatched_or_deleted_files_can_be_written(tmp_path):
+    path = str(tmp_path / 'catalog.json')
+    watcher = FileWatcher()
+    assert not watcher.changed_outside(path)
+    write(path, 'v1', 1_000_000_000)
+    watcher.watch(path, read, lambda data: None)
+    os.remove(path)
+    assert not watcher.changed_outside(path)
@@ -0,0 +1,98 @@
+import logging
+import time
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Nombre de créneaux conservés (tampons circulaires)
+HOUR_SLOTS = 48
+DAY_SLOTS = 32
+
+class ViewTimeline:
+    """
+    Vues agrégées par heure et par jour dans des tampons circulaires de taille fixe.
+    Chaque créneau garde l'heure (ou le jour) qu'il représente : un créneau périmé
+    est ignoré en lecture et recyclé à la prochaine écriture.
+    La réinitialisation déplace simplement l'époque, sans effacer les tampons.
+    """
+
+    def __init__(self):
+        self.hour_stamps = array('q', [-1] * HOUR_SLOTS)
+        self.hour_counts = array('I', [0] * HOUR_SLOTS)
+        self.day_stamps = array('q', [-1] * DAY_SLOTS)
+        self.day_counts = array('I', [0] * DAY_SLOTS)
+        self.epoch_hour = 0
+        self.epoch_day = 0
+
+    @staticmethod
+    def _increment(stamps, counts, stamp):
+        slot = stamp % len(stamps)
+        if stamps[slot] != stamp:
+            stamps[slot] = stamp
+            counts[slot] = 0
+        counts[slot] += 1
+
+    def record(self, now=None):
+        """Enregistre une vue"""
+        now = time.time() if now is None else now
+        self._increment(self.hour_stamps, self.hour_counts, int(now // 3600))
+        self._increment(self.day_stamps, self.day_counts, int(now // 86400))
+
+    def reset(self, now=None):
+        """Ignore toutes les vues enregistrées avant maintenant"""
+        now = time.time() if now is None else now
+        self.epoch_hour = int(now // 3600)
+        self.epoch_day = int(now // 86400)
+        # Les créneaux en cours contiennent des vues antérieures à la réinitialisation
+        for stamps, counts, stamp in (
+            (self.hour_stamps, self.hour_counts, self.epoch_hour),
+            (self.day_stamps, self.day_counts, self.epoch_day),
+        ):
+            slot = stamp % len(stamps)
+            stamps[slot] = stamp
+            counts[slot] = 0
+
+    @staticmethod
+    def _sum(stamps, counts, first, last):
+        return sum(count for stamp, count in zip(stamps, counts) if first <= stamp <= last)
+
+    def last_hours(self, hours, now=None):
+        """Nombre de vues sur les `hours` dernières heures (heure en cours comprise)"""
+        now = time.time() if now is None else now
+        current = int(now // 3600)
+        first = max(current - min(hours, HOUR_SLOTS) + 1, self.epoch_hour)
+        return self._sum(self.hour_stamps, self.hour_counts, first, current)
+
+    def last_days(self, days, now=None):
+        """Nombre de vues sur les `days` derniers jours (jour en cours compris)"""
+        now = time.time() if now is None else now
+        current = int(now // 86400)
+        first = max(current - min(days, DAY_SLOTS) + 1, self.epoch_day)
+        return self._sum(self.day_stamps, self.day_counts, first, current)
+
+    def to_dict(self):
+        return {
+            'hour_stamps': self.hour_stamps.tolist(),
+            'hour_counts': self.hour_counts.tolist(),
+            'day_stamps': self.day_stamps.tolist(),
+            'day_counts': self.day_counts.tolist(),
+            'epoch_hour': self.epoch_hour,
+            'epoch_day': self.epoch_day
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        timeline = cls()
+        if not data:
+            return timeline
+        try:
+            if len(data['hour_stamps']) == HOUR_SLOTS and len(data['day_stamps']) == DAY_SLOTS:
+                timeline.hour_stamps = array('q', data['hour_stamps'])
+                timeline.hour_counts = array('I', data['hour_counts'])
+                timeline.day_stamps = array('q', data['day_stamps'])
+                timeline.day_counts = array('I', data['day_counts'])
+            timeline.epoch_hour = data.get('epoch_hour', 0)
+            timeline.epoch_day = data.get('epoch_day', 0)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Erreur lors du chargement de l'historique des vues: {e}")
+        return timeline
@@ -1,11 +1,30 @@
+import logging
 import sqlite3
 from datetime import datetime
+from metrics import timed
+
+logger = logging.getLogger(__name__)
 
 class DatabaseManager:
-    def __init__(self):
-        self.conn = sqlite3.connect('blackjack.db', check_same_thread=False)
-        self.cursor = self.conn.cursor()
-        self.setup_database()
+    def __init__(self, path='blackjack.db'):
+        # La connexion est ouverte à la première requête : importer ce module ne touche pas au disque
+        self.path = path
+        self._conn = None
+        self._cursor = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._cursor = self._conn.cursor()
+            self.setup_database()
+        return self._conn
+
+    @property
+    def cursor(self):
+        if self._cursor is None:
+            self.conn
+        return self._cursor
     
     def setup_database(self):
         """Initialise la structure de la base de données si elle n'existe pas"""
@@ -32,15 +51,17 @@ class DatabaseManager:
         ''')
         self.conn.commit()
     
+    @timed('db')
     def get_balance(self, user_id: int) -> int:
         try:
             self.cursor.execute('SELECT balance FROM users WHERE user_id = ?', (user_id,))
             result = self.cursor.fetchone()
             return result[0] if result else 0
         except Exception as e:
-            print(f"Erreur dans get_balance: {e}")
+            logger.error(f"Erreur dans get_balance: {e}")
             return 0
 
+    @timed('db')
     def update_game_result(self, user_id: int, bet_amount: int, result: str):
         try:
             multiplier = {
@@ -73,9 +94,10 @@ class DatabaseManager:
             
             self.conn.commit()
         except Exception as e:
-            print(f"Erreur dans update_game_result: {e}")
+            logger.error(f"Erreur dans update_game_result: {e}")
             self.conn.rollback()
 
+    @timed('db')
     def user_exists(self, user_id: int) -> bool:
         """Vérifie si un utilisateur existe dans la base de données"""
         self.cursor.execute('SELECT 1 FROM users WHERE user_id = ?', (user_id,))
@@ -83,7 +105,10 @@ class DatabaseManager:
 
     def close(self):
         """Ferme la connexion à la base de données"""
-        self.conn.close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._cursor = None
 
 # Créez l'instance de la base de données
 db = DatabaseManager()
@@ -0,0 +1,73 @@
+import logging
+import asyncio
+import os
+
+logger = logging.getLogger(__name__)
+
+class FileWatcher:
+    """
+    Surveille des fichiers par comparaison de leur date de modification.
+    Quand un fichier change, il est relu et validé dans un thread (hors de la boucle
+    d'évènements), puis la fonction on_change reçoit le nouveau contenu.
+    """
+
+    def __init__(self, interval=5.0):
+        self.interval = interval
+        self.files = {}
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def watch(self, path, load, on_change):
+        """load(path) lit et valide le fichier (exécuté dans un thread), on_change(data) applique le résultat"""
+        self.files[path] = {'mtime': self._mtime(path), 'load': load, 'on_change': on_change}
+
+    def mark_written(self, path):
+        """À appeler après une écriture du bot lui-même, pour ne pas la recharger"""
+        if path in self.files:
+            self.files[path]['mtime'] = self._mtime(path)
+
+    def changed_outside(self, path):
+        """
+        Le fichier a été modifié hors du bot depuis la dernière écriture ou le dernier rechargement
+        (modification pas encore rechargée) : le bot ne doit pas l'écraser.
+        """
+        entry = self.files.get(path)
+        if entry is None:
+            return False
+        mtime = self._mtime(path)
+        return mtime is not None and mtime != entry['mtime']
+
+    async def check(self):
+        for path, entry in list(self.files.items()):
+            mtime = self._mtime(path)
+            if mtime is None or mtime == entry['mtime']:
+                continue
+
+            # Tant que la modification n'est pas appliquée, changed_outside() empêche le bot d'écrire
+            try:
+                data = await asyncio.to_thread(entry['load'], path)
+            except Exception as e:
+                logger.warning(f"Fichier {path} modifié mais invalide, ignoré: {e}")
+                entry['mtime'] = mtime
+                continue
+
+            # Le fichier a encore changé pendant la lecture : on attend le prochain passage
+            if self._mtime(path) != mtime:
+                continue
+
+            entry['mtime'] = mtime
+            try:
+                entry['on_change'](data)
+                logger.info(f"🔄 Fichier {path} rechargé")
+            except Exception as e:
+                logger.error(f"Erreur lors du rechargement de {path}: {e}")
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()